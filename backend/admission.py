@@ -0,0 +1,118 @@
+import asyncio
+import math
+import time
+from collections import Counter, deque
+
+
+class AdmissionRejected(Exception):
+    """Raised by AdmissionController.acquire(); carries the HTTP answer to send."""
+
+    def __init__(self, status_code, detail, retry_after):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounds how many expensive requests run at once, on one event loop.
+
+    At most max_concurrent requests run; up to max_queue more wait in FIFO
+    order for at most queue_timeout_seconds. A key (the user) may hold at
+    most max_per_user running or queued requests. Anything over a limit is
+    rejected right away: 429 for the per-user limit, 503 when the queue is
+    full or the wait times out, with a Retry-After estimated from recent
+    service times.
+    """
+
+    def __init__(self, max_concurrent=8, max_per_user=2, max_queue=32, queue_timeout_seconds=10.0):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.active = 0
+        self.admitted = 0
+        self.max_queue_depth = 0
+        self.rejected = Counter()
+        self._waiters = deque()  # futures resolved when a slot is handed over
+        self._per_key = Counter()
+        self._service_seconds = 1.0  # moving average of how long a slot is held
+
+    def retry_after(self):
+        """Seconds until a slot is likely to be free, at least 1."""
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._service_seconds * backlog / self.max_concurrent))
+
+    def _reject(self, reason, status_code, detail):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(status_code, detail, self.retry_after())
+
+    async def acquire(self, key):
+        """Waits for a slot and returns a token for release(); raises AdmissionRejected."""
+        if self._per_key[key] >= self.max_per_user:
+            self._reject("perUser", 429, "Too many consultant requests in progress, please wait for them to finish.")
+
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+        else:
+            if len(self._waiters) >= self.max_queue:
+                self._reject("queueFull", 503, "The AI Consultant is busy, please retry shortly.")
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            self._per_key[key] += 1
+            try:
+                await asyncio.wait_for(future, timeout=self.queue_timeout_seconds)
+            except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+                self._leave(key)
+                if future.done() and not future.cancelled():
+                    # The slot was handed over as the wait ended; pass it on.
+                    self._hand_over_or_free()
+                else:
+                    try:
+                        self._waiters.remove(future)
+                    except ValueError:
+                        pass
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+                self._reject("timedOut", 503, "The AI Consultant is busy, please retry shortly.")
+            self._per_key[key] -= 1
+
+        self._per_key[key] += 1
+        self.admitted += 1
+        return time.monotonic()
+
+    def _hand_over_or_free(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot stays taken, by the waiter now
+                return
+        self.active -= 1
+
+    def _leave(self, key):
+        self._per_key[key] -= 1
+        if self._per_key[key] <= 0:
+            del self._per_key[key]
+
+    def release(self, key, token):
+        self._leave(key)
+        self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.monotonic() - token)
+        self._hand_over_or_free()
+
+    def stats(self):
+        return {
+            "active": self.active,
+            "queued": len(self._waiters),
+            "maxQueued": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": {reason: self.rejected[reason] for reason in ("perUser", "queueFull", "timedOut")},
+            "averageServiceSeconds": round(self._service_seconds, 3),
+            "limits": {
+                "maxConcurrent": self.max_concurrent,
+                "maxPerUser": self.max_per_user,
+                "maxQueue": self.max_queue,
+                "queueTimeoutSeconds": self.queue_timeout_seconds,
+            },
+        }
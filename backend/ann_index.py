@@ -0,0 +1,259 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+
+def normalize_rows(matrix):
+    """L2-normalizes each row of a float32 matrix, leaving zero rows as zeros."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _default_n_lists(count):
+    return max(1, min(count, int(round(np.sqrt(count)))))
+
+
+def _default_n_probe(n_lists):
+    return max(1, min(n_lists, max(8, n_lists // 10)))
+
+
+def _replace_file(path, write):
+    # Write next to the target and rename over it: processes that memory-mapped
+    # the old file keep reading the old inode instead of a truncated one.
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _assign(vectors, centroids, chunk_size=8192):
+    """Returns the index of the nearest (highest cosine) centroid of every row."""
+    assignments = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        block = vectors[start:start + chunk_size]
+        assignments[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors, n_lists, iterations=10, seed=0, max_training_points=256):
+    """Spherical k-means on (a sample of) normalized vectors."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * max_training_points)
+    sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+    centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = _assign(sample, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        counts = np.bincount(assignments, minlength=n_lists)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty lists with random points so every list stays useful.
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids.astype(np.float32)
+
+
+class _ExtraList:
+    """
+    Vectors inserted into one IVF list after the build. Rows are only
+    appended (deletes are tombstones) and the arrays grow by doubling, so a
+    search that read count can use the first count rows while a writer
+    appends.
+    """
+
+    def __init__(self, dim, capacity=8):
+        self.ids = []
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.deleted = np.zeros(capacity, dtype=bool)
+        self.count = 0
+
+    def append(self, tool_id, vector):
+        if self.count == len(self.vectors):
+            self.vectors = np.concatenate([self.vectors, np.zeros_like(self.vectors)])
+            self.deleted = np.concatenate([self.deleted, np.zeros_like(self.deleted)])
+        row = self.count
+        self.vectors[row] = vector
+        self.ids.append(tool_id)
+        self.count = row + 1  # published last
+        return row
+
+
+class IVFIndex:
+    """
+    Inverted-file (IVF) approximate nearest-neighbour index for cosine search.
+
+    Vectors are clustered around n_lists k-means centroids and stored sorted by
+    list, so probing a list reads one contiguous slice of the (possibly
+    memory-mapped) vector matrix. A query scores the centroids, probes the
+    n_probe closest lists and only ranks the vectors in them.
+
+    Inserts land in small in-memory per-list buffers and deletes are
+    tombstones, so the on-disk base never has to be rewritten on the request
+    path; save() writes a merged copy. Searches need no lock against a single
+    writer calling add()/remove(): nothing they read is moved or rewritten.
+    """
+
+    def __init__(self, ids, vectors, centroids, offsets, n_probe=None, version=None):
+        self.ids = list(ids)
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+        self.n_lists = len(centroids)
+        self.n_probe = n_probe or _default_n_probe(self.n_lists)
+        self.version = version
+        self.dim = centroids.shape[1]
+        self._row_by_id = {tool_id: row for row, tool_id in enumerate(self.ids)}
+        self._deleted = np.zeros(len(self.ids), dtype=bool)
+        self._deleted_count = 0
+        self._extra = {}  # list number -> _ExtraList inserted after the build
+        self._extra_rows = {}  # live inserted tool id -> (list number, row)
+
+    def __len__(self):
+        return len(self.ids) - self._deleted_count + len(self._extra_rows)
+
+    def __contains__(self, tool_id):
+        row = self._row_by_id.get(tool_id)
+        if row is not None and not self._deleted[row]:
+            return True
+        return tool_id in self._extra_rows
+
+    @classmethod
+    def build(cls, ids, vectors, n_lists=None, n_probe=None, iterations=10, seed=0):
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        n_lists = n_lists or _default_n_lists(len(vectors))
+        centroids = train_centroids(vectors, n_lists, iterations=iterations, seed=seed)
+        return cls._from_assignments(list(ids), vectors, centroids, _assign(vectors, centroids), n_probe)
+
+    @classmethod
+    def _from_assignments(cls, ids, vectors, centroids, assignments, n_probe=None):
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        sorted_vectors = np.ascontiguousarray(vectors[order])
+        sorted_ids = [ids[row] for row in order]
+        digest = hashlib.sha1()
+        digest.update("\n".join(sorted_ids).encode("utf-8"))
+        digest.update(sorted_vectors.tobytes())
+        return cls(sorted_ids, sorted_vectors, centroids, offsets, n_probe=n_probe, version=digest.hexdigest()[:16])
+
+    # --- Incremental updates ---
+
+    def add(self, tool_id, vector):
+        if tool_id in self:
+            self.remove(tool_id)
+        vector = normalize_rows(np.asarray(vector, dtype=np.float32).reshape(1, -1))
+        list_no = int(np.argmax(self.centroids @ vector[0]))
+        extra = self._extra.get(list_no)
+        if extra is None:
+            extra = self._extra[list_no] = _ExtraList(self.dim)
+        self._extra_rows[tool_id] = (list_no, extra.append(tool_id, vector[0]))
+
+    def remove(self, tool_id):
+        row = self._row_by_id.get(tool_id)
+        if row is not None and not self._deleted[row]:
+            self._deleted[row] = True
+            self._deleted_count += 1
+        inserted = self._extra_rows.pop(tool_id, None)
+        if inserted is not None:
+            list_no, row = inserted
+            self._extra[list_no].deleted[row] = True
+
+    def live_ids(self):
+        live = [tool_id for row, tool_id in enumerate(self.ids) if not self._deleted[row]]
+        live.extend(self._extra_rows)
+        return live
+
+    # --- Search ---
+
+    def search(self, query_embedding, k=5, n_probe=None):
+        """Returns [(tool_id, cosine similarity), ...], best first."""
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0 or len(self) == 0:
+            return []
+        query = query / norm
+
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probed = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+
+        candidate_ids, candidate_scores = [], []
+        for list_no in probed:
+            start, end = int(self.offsets[list_no]), int(self.offsets[list_no + 1])
+            if end > start:
+                scores = self.vectors[start:end] @ query
+                live = ~self._deleted[start:end]
+                candidate_scores.append(scores[live])
+                candidate_ids.extend(self.ids[row] for row in np.flatnonzero(live) + start)
+            extra = self._extra.get(int(list_no))
+            count = extra.count if extra is not None else 0
+            if count:
+                live = ~extra.deleted[:count]
+                candidate_scores.append((extra.vectors[:count] @ query)[live])
+                candidate_ids.extend(extra.ids[row] for row in np.flatnonzero(live))
+
+        if not candidate_ids:
+            return []
+        scores = np.concatenate(candidate_scores)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(candidate_ids[i], float(scores[i])) for i in top]
+
+    # --- Persistence ---
+
+    def _merged(self):
+        live = ~self._deleted
+        ids = [tool_id for row, tool_id in enumerate(self.ids) if live[row]]
+        vectors = [np.asarray(self.vectors[live])]
+        assignments = [np.repeat(np.arange(self.n_lists), np.diff(self.offsets))[live]]
+        for list_no, extra in self._extra.items():
+            live = np.flatnonzero(~extra.deleted[:extra.count])
+            ids.extend(extra.ids[row] for row in live)
+            vectors.append(extra.vectors[live])
+            assignments.append(np.full(len(live), list_no))
+        return ids, np.vstack(vectors), np.concatenate(assignments).astype(np.int32)
+
+    def save(self, directory):
+        """Writes the index (with pending inserts/deletes merged in) to directory."""
+        ids, vectors, assignments = self._merged()
+        merged = IVFIndex._from_assignments(ids, vectors, self.centroids, assignments, self.n_probe)
+        os.makedirs(directory, exist_ok=True)
+        _replace_file(os.path.join(directory, "vectors.npy"), lambda f: np.save(f, merged.vectors))
+        _replace_file(os.path.join(directory, "centroids.npy"), lambda f: np.save(f, merged.centroids))
+        _replace_file(os.path.join(directory, "offsets.npy"), lambda f: np.save(f, merged.offsets))
+        _replace_file(os.path.join(directory, "ids.json"), lambda f: f.write(json.dumps(merged.ids).encode("utf-8")))
+        manifest = {
+            "format": FORMAT_VERSION,
+            "version": merged.version,
+            "createdAt": datetime.now(timezone.utc).isoformat(),
+            "count": len(merged.ids),
+            "dim": merged.dim,
+            "nLists": merged.n_lists,
+            "nProbe": merged.n_probe,
+        }
+        # The manifest is written last, so a reader never sees a half-written index.
+        _replace_file(os.path.join(directory, MANIFEST_FILE), lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+        return manifest
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Loads a saved index; the vector matrix is memory-mapped by default."""
+        with open(os.path.join(directory, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported ANN index format: {manifest.get('format')}")
+        with open(os.path.join(directory, "ids.json"), "r", encoding="utf-8") as f:
+            ids = json.load(f)
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        centroids = np.load(os.path.join(directory, "centroids.npy"))
+        offsets = np.load(os.path.join(directory, "offsets.npy"))
+        return cls(ids, vectors, centroids, offsets, n_probe=manifest.get("nProbe"), version=manifest["version"])
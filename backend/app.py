@@ -1,46 +1,125 @@
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.routing import Match
 from pymongo import MongoClient
 from dotenv import load_dotenv
+import asyncio
+import json
 import os
+import time
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 from typing import List, Optional
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from sentence_transformers import SentenceTransformer
-import google.generativeai as genai
 from fastapi import Body, HTTPException
+from admission import AdmissionController, AdmissionRejected
+from catalog import EMBEDDING_FIELD, Catalog
+from consultant_history import ConsultantHistory
+from response_cache import VersionedResponseCache
+from search_index import KeywordIndex, tokenize
+from retrieval import create_retriever, project_for_retrieval
+from embeddings import BatchingEncoder, CachedEncoder
+from facets import FacetIndex
+from fuzzy import FuzzyIndex
+from hybrid import MIN_VECTOR_SIMILARITY, RETRIEVAL_MODES, HybridRetriever, server_timing
+from insights import InsightsStore
+from suggest import MAX_SUGGESTIONS, SuggestIndex
+from embedding_backends import LazyEmbeddingBackend
+from llm import FakeLLMClient, GeminiClient
+from semantic_cache import SemanticCache
+from similar_tools import SIMILAR_FIELD, SIMILAR_K
+from executors import create_executor, run_in
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Gauge, Histogram, generate_latest
+from metrics import DEFAULT_BUCKETS, ComponentCollector, MongoCommandTimer
+from ttl_cache import TTLCache
+from readiness import Readiness
 
 
-
-STOP_WORDS = {
-    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your", 
-    "he", "him", "his", "she", "her", "it", "its", "they", "them", "their", 
-    "what", "which", "who", "whom", "this", "that", "these", "those", "am", 
-    "is", "are", "was", "were", "be", "been", "being", "have", "has", "had", 
-    "do", "does", "did", "a", "an", "the", "and", "but", "if", "or", "because", 
-    "as", "until", "while", "of", "at", "by", "for", "with", "about", "to", 
-    "from", "in", "out", "on", "off", "over", "under", "again", "further", 
-    "then", "once", "here", "there", "when", "where", "why", "how", "all", 
-    "any", "both", "each", "few", "more", "most", "other", "some", "such", 
-    "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very", 
-    "can", "will", "just", "don", "should", "now", "find", "show", "give", "me"
-}
-
 # --- Load Environment Variables ---
 load_dotenv()
+# "mongomock://" runs on an in-memory stand-in (benchmarks/load_test.py)
 mongo_uri = os.getenv("MONGO_URI")
 SECRET_KEY = os.getenv("SECRET_KEY", "a_default_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+GEMINI_MODEL_NAME = 'gemini-2.5-flash-preview-05-20'
+# "gemini" (default) or "fake" for offline runs and benchmarks
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+FAKE_LLM_DELAY_SECONDS = float(os.getenv("FAKE_LLM_DELAY_SECONDS", "0"))
+CATALOG_TTL_SECONDS = int(os.getenv("CATALOG_TTL_SECONDS", "300"))
+# A failed warm-up (database or models) is retried with exponential backoff up to this
+DATABASE_RETRY_MAX_SECONDS = float(os.getenv("DATABASE_RETRY_MAX_SECONDS", "30"))
+# "local" searches an in-memory matrix, "ann" a memory-mapped IVF index,
+# "atlas" uses MongoDB Atlas $vectorSearch
+VECTOR_RETRIEVER = os.getenv("VECTOR_RETRIEVER", "local")
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ann_index"))
+# How the chatbot and the consultant retrieve tools: "hybrid" (BM25 and
+# vector search fused with reciprocal-rank fusion), "keyword" or "vector"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+if RETRIEVAL_MODE not in RETRIEVAL_MODES:
+    raise ValueError(f"Unknown RETRIEVAL_MODE: {RETRIEVAL_MODE}")
+# The chatbot answers with BM25 alone when the vector side (embedding the
+# query on the busy CPU pool) takes longer than this after the BM25 lookup
+CHATBOT_VECTOR_TIMEOUT_MS = float(os.getenv("CHATBOT_VECTOR_TIMEOUT_MS", "100"))
+# Vector hits less similar than this to the query are not retrieved at all
+VECTOR_MIN_SIMILARITY = float(os.getenv("VECTOR_MIN_SIMILARITY", str(MIN_VECTOR_SIMILARITY)))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+# "torch" (SentenceTransformer), "onnx" or "onnx-int8" (see export_onnx_model.py),
+# or "hashing", a model-free stand-in for offline runs and load tests
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_model"))
+# Concurrent query encodes are merged into batches of up to this size,
+# waiting at most EMBEDDING_BATCH_WAIT_MS for the batch to fill
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "900"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+# Slim principals of authenticated users, keyed by token subject (email)
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "4096"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+# Admission control for /api/consultant(/stream): running requests overall
+# and per user, and how many may wait (and for how long) for a free slot
+CONSULTANT_MAX_CONCURRENT = int(os.getenv("CONSULTANT_MAX_CONCURRENT", "8"))
+CONSULTANT_MAX_PER_USER = int(os.getenv("CONSULTANT_MAX_PER_USER", "2"))
+CONSULTANT_MAX_QUEUE = int(os.getenv("CONSULTANT_MAX_QUEUE", "32"))
+CONSULTANT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("CONSULTANT_QUEUE_TIMEOUT_SECONDS", "10"))
+# Bounded pools that keep blocking work off the event loop
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "16"))
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+AUTH_POOL_SIZE = int(os.getenv("AUTH_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
 
 # --- App Initialization ---
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app):
+    # See "Startup Warm-up & Readiness" below
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        if catalog is not None:
+            catalog.stop()
+        # The executors are left running: they are built at import
+        # and shared by every lifespan of the app in this process.
+
+app = FastAPI(lifespan=lifespan)
+
+# pymongo (and Atlas $vectorSearch) calls run on db_executor and model
+# encoding on cpu_executor. bcrypt gets its own auth_executor so a burst of
+# logins does not delay query embeddings. LLM calls are awaited natively.
+db_executor = create_executor(DB_POOL_SIZE, "db")
+cpu_executor = create_executor(CPU_POOL_SIZE, "cpu")
+auth_executor = create_executor(AUTH_POOL_SIZE, "auth")
 origins = [
     "http://localhost:8080", 
 ]
@@ -54,41 +133,244 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "Server-Timing"],
+)
+
+
+# --- Metrics (served at /metrics in the Prometheus text format) ---
+metrics_registry = CollectorRegistry()
+http_request_seconds = Histogram(
+    "http_request_duration_seconds",
+    "Time to the response headers, by route template.",
+    ("method", "route", "status"),
+    buckets=DEFAULT_BUCKETS, registry=metrics_registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight", "Requests being handled, by route template.", ("method", "route"),
+    registry=metrics_registry,
+)
+consultant_stage_seconds = Histogram(
+    "consultant_stage_duration_seconds",
+    "Time spent in each stage of a consultant request.",
+    ("stage",),
+    buckets=DEFAULT_BUCKETS, registry=metrics_registry,
+)
+retrieval_stage_seconds = Histogram(
+    "retrieval_stage_duration_seconds",
+    "Time spent in each retrieval stage, by endpoint and retrieval mode.",
+    ("endpoint", "mode", "stage"),
+    buckets=DEFAULT_BUCKETS, registry=metrics_registry,
+)
+mongo_command_seconds = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trips.", ("command", "outcome"),
+    buckets=DEFAULT_BUCKETS, registry=metrics_registry,
 )
 
+def route_template(request):
+    # The path template ("/api/tools/{tool_id}") keeps label cardinality bounded
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    labels = {"method": request.method, "route": route_template(request)}
+    in_flight = http_requests_in_flight.labels(**labels)
+    in_flight.inc()
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        http_request_seconds.labels(status=status_code, **labels).observe(time.perf_counter() - start)
+        in_flight.dec()
+
 
 # --- Database Connection ---
+# MongoClient connects in the background; the ping happens in the warm-up.
 try:
-    client = MongoClient(mongo_uri)
+    if mongo_uri and mongo_uri.startswith("mongomock://"):
+        import mongomock  # only needed for the in-memory stand-in
+        client = mongomock.MongoClient()
+        print("⚠️ Using an in-memory mongomock database (MONGO_URI=mongomock://).")
+    else:
+        client = MongoClient(mongo_uri, event_listeners=[MongoCommandTimer(mongo_command_seconds)])
     db = client.GenAI_DB
     tools_collection = db.tools
     users_collection = db.users # New collection for users
-    client.admin.command('ping')
-    print("✅ MongoDB connection successful.")
+    consultant_history = ConsultantHistory(db.consultant_history)
 except Exception as e:
     print(f"❌ Could not connect to MongoDB. Error: {e}")
     client = None
     tools_collection = None
     users_collection = None
+    consultant_history = None
+
+# In-memory catalog snapshot that serves the read-heavy tool endpoints.
+# Only the local retriever reads embeddings from the snapshot; ann and atlas
+# keep theirs outside the catalog
+catalog = Catalog(
+    tools_collection, db.catalog_meta, ttl_seconds=CATALOG_TTL_SECONDS, with_embeddings=VECTOR_RETRIEVER == "local",
+) if tools_collection is not None else None
+
+# The full /api/tools body, serialized and compressed once per catalog version.
+tools_list_response = VersionedResponseCache(lambda snapshot: snapshot.tools)
+# BM25 keyword index used by the chatbot, kept in sync with the catalog.
+keyword_index = KeywordIndex()
+# Category/pricing bitmaps for the filter bar's faceted search.
+facet_index = FacetIndex()
+# Trigram index over names and categories, the fallback for misspelled queries.
+fuzzy_index = FuzzyIndex()
+# Sorted prefix array behind the search bar's typeahead.
+suggest_index = SuggestIndex()
+# Insights/Trends aggregates, materialized by run_pipeline.py and served from memory.
+insights_store = InsightsStore(db.catalog_meta if tools_collection is not None else None)
+# Vector retriever for the consultant; the local one is rebuilt from the catalog.
+vector_retriever = create_retriever(VECTOR_RETRIEVER, tools_collection, ANN_INDEX_DIR)
+# BM25 (with the fuzzy fallback) and vector search, fused; serves the chatbot and the consultant.
+hybrid_retriever = HybridRetriever(
+    keyword_index, vector_retriever, fuzzy_index, min_vector_similarity=VECTOR_MIN_SIMILARITY,
+)
+if catalog is not None:
+    catalog.subscribe(tools_list_response.rebuild)
+    catalog.subscribe(keyword_index.update)
+    catalog.subscribe(facet_index.update)
+    catalog.subscribe(fuzzy_index.update)
+    catalog.subscribe(suggest_index.update)
+    catalog.subscribe(insights_store.update)
+    if hasattr(vector_retriever, "update"):
+        catalog.subscribe(vector_retriever.update)
+
+def get_catalog_snapshot():
+    if catalog is None:
+        raise HTTPException(status_code=500, detail="Database connection not configured.")
+    snapshot = catalog.snapshot
+    if not snapshot.is_loaded:
+        raise HTTPException(status_code=503, detail="Tool catalog is still loading.")
+    return snapshot
     
-# Load the embedding model once when the server starts for efficiency
-embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-print("✅ SentenceTransformer model loaded.")
-
-if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
-    # --- THIS IS THE FIX ---
-    # We are updating the model name to a current, powerful version.
-    gemini_model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
-    print("✅ Gemini client configured.")
+# The embedding model is loaded once by the startup warm-up, not at import time
+embedding_model = LazyEmbeddingBackend(EMBEDDING_BACKEND, EMBEDDING_MODEL_DIR)
+# Cache misses from concurrent requests are encoded together in one batch
+embedding_batcher = BatchingEncoder(
+    embedding_model,
+    cpu_executor,
+    max_batch_size=EMBEDDING_BATCH_SIZE,
+    max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+)
+# Repeated consultant prompts reuse their embedding instead of re-running the model
+query_encoder = CachedEncoder(
+    embedding_batcher,
+    max_size=QUERY_EMBEDDING_CACHE_SIZE,
+    ttl_seconds=QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+if LLM_BACKEND == "fake":
+    llm_client = FakeLLMClient(delay_seconds=FAKE_LLM_DELAY_SECONDS)
+    print("⚠️ Using the fake LLM client (LLM_BACKEND=fake).")
+elif GOOGLE_API_KEY:
+    # google.generativeai is imported and configured by the warm-up
+    llm_client = GeminiClient(GEMINI_MODEL_NAME, GOOGLE_API_KEY)
 else:
-    gemini_model = None
+    llm_client = None
     print("⚠️ WARNING: GOOGLE_API_KEY not found. AI Consultant will not work.")
 
+# Reuses answers for near-identical prompts over the same retrieved tools
+semantic_cache = SemanticCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    ttl_seconds=SEMANTIC_CACHE_TTL_SECONDS,
+    max_size=SEMANTIC_CACHE_SIZE,
+)
+if catalog is not None:
+    catalog.subscribe(semantic_cache.invalidate)
+
+# Keeps bursts of consultant calls from saturating the CPU pool and the LLM
+consultant_admission = AdmissionController(
+    max_concurrent=CONSULTANT_MAX_CONCURRENT,
+    max_per_user=CONSULTANT_MAX_PER_USER,
+    max_queue=CONSULTANT_MAX_QUEUE,
+    queue_timeout_seconds=CONSULTANT_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+# --- Startup Warm-up & Readiness ---
+# The server accepts connections (and /healthz answers) right away; the
+# heavy work runs in a startup task and /readyz reports when it is done.
+readiness = Readiness(
+    ["mongo", "catalog", "embedding_model"] + (["llm"] if llm_client is not None else [])
+)
+if catalog is not None:
+    # Also flips to ready when a failed initial load is retried in the background
+    catalog.subscribe(lambda snapshot: readiness.mark_ready("catalog"))
+
+def prepare_database():
+    if client is None:
+        raise RuntimeError("Database connection not configured.")
+    client.admin.command('ping')
+    consultant_history.ensure_indexes()
+
+def load_embedding_model():
+    embedding_model.load()
+    embedding_model.encode(["warm-up"])  # the first forward pass is the slowest
+
+async def warm_up_component(name, executor, func):
+    start = time.perf_counter()
+    try:
+        await run_in(executor, func)
+    except Exception as e:
+        readiness.mark_failed(name, e)
+        print(f"❌ Warm-up of {name} failed. Error: {e}")
+        return False
+    readiness.mark_ready(name)
+    print(f"✅ Warm-up: {name} ready in {time.perf_counter() - start:.2f}s.")
+    return True
+
+async def warm_up_database():
+    database_ready = await warm_up_component("mongo", db_executor, prepare_database)
+    if database_ready and catalog is not None:
+        if not await warm_up_component("catalog", db_executor, catalog.load):
+            print("⚠️ The catalog will be retried in the background.")
+    if catalog is not None:
+        catalog.start()
+    # Until the ping and ensure_indexes() succeed, /readyz reports "mongo" down
+    delay = 1
+    while not database_ready and client is not None:
+        print(f"⚠️ Retrying the database warm-up in {delay}s.")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, DATABASE_RETRY_MAX_SECONDS)
+        database_ready = await warm_up_component("mongo", db_executor, prepare_database)
+        if database_ready and catalog is not None and not catalog.snapshot.is_loaded:
+            # Sooner than the next background refresh
+            await warm_up_component("catalog", db_executor, catalog.load)
+
+async def warm_up_with_retry(name, executor, func):
+    # Until func succeeds, /readyz reports the component down with its last error
+    delay = 1
+    while not await warm_up_component(name, executor, func):
+        print(f"⚠️ Retrying the {name} warm-up in {delay}s.")
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, DATABASE_RETRY_MAX_SECONDS)
+
+async def warm_up():
+    # Database and models warm up side by side
+    await asyncio.gather(
+        warm_up_database(),
+        warm_up_with_retry("embedding_model", cpu_executor, load_embedding_model),
+        *([warm_up_with_retry("llm", cpu_executor, llm_client.load)] if llm_client is not None else []),
+    )
+
 
 # --- Security & Hashing Setup ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# get_current_user only needs to know the account still exists; the cached
+# principal is dropped explicitly on signup and password reset.
+PRINCIPAL_PROJECTION = {"_id": 0, "email": 1}
+principal_cache = TTLCache(max_size=USER_CACHE_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
 
 # --- Pydantic Models (Data Shapes) ---
 class UserCreate(BaseModel):
@@ -126,6 +408,11 @@ class ConsultantQuery(BaseModel):
     prompt: str
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """
+    Returns the slim principal ({"email": ...}) of the token's user. It is
+    served from principal_cache; endpoints that need the rest of the user
+    document read it themselves.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -139,10 +426,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    user = users_collection.find_one({"email": token_data.email})
-    if user is None:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get(token_data.email)
+    if principal is None:
+        principal = await run_in(db_executor, users_collection.find_one, {"email": token_data.email}, PRINCIPAL_PROJECTION)
+        if principal is None:
+            raise credentials_exception
+        principal_cache.set(token_data.email, principal)
+    return dict(principal)
 
 # --- API Endpoints ---
 
@@ -150,6 +440,28 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 def read_root():
     return {"message": "Welcome to the Gen AI Landscape API"}
 
+metrics_registry.register(ComponentCollector(
+    caches={"query_embedding": query_encoder.cache, "semantic": semantic_cache, "principal": principal_cache},
+    admission=consultant_admission,
+    batcher=embedding_batcher,
+    catalog=catalog,
+))
+
+@app.get("/metrics")
+def get_metrics():
+    return Response(content=generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 200 once the database, catalog and models are warm, 503 before."""
+    status_body = readiness.status()
+    return JSONResponse(content=status_body, status_code=200 if status_body["ready"] else 503)
+
 # --- Tools Endpoint (Existing) ---
 class ChatRequest(BaseModel):
     message: str
@@ -162,49 +474,165 @@ from fastapi import HTTPException
 from fastapi.responses import JSONResponse
 
 @app.get("/api/tools")
-def get_all_tools():
-    if tools_collection is None:
-        print("❌ tools_collection is None")
-        raise HTTPException(status_code=500, detail="Database connection not configured.")
+def get_all_tools(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    pricing: Optional[str] = None,
+    min_trend_score: Optional[float] = None,
+    ids: Optional[str] = None,
+):
+    """
+    Lists tools from the catalog snapshot.
 
-    try:
-        raw_tools = list(tools_collection.find({}, {"_id": 0}))
-        if not raw_tools:
-            print("⚠️ No tools found in the database.")
-            raise HTTPException(status_code=404, detail="No tools found in the database.")
-
-        # Defensive sanitization
-        tools = [
-            {
-                "id": tool.get("id", ""),
-                "name": tool.get("name", ""),
-                "description": tool.get("description", ""),
-                "categories": tool.get("categories", []),
-                "useCases": tool.get("useCases", []),
-                "trendScore": tool.get("trendScore", 0),
-                "website": tool.get("website", ""),
-                "github": tool.get("github", ""),
-                "docs": tool.get("docs", ""),
-                "createdAt": tool.get("createdAt", ""),
-            }
-            for tool in raw_tools
-        ]
+    Without parameters the whole list is served from the pre-compressed cache.
+    Otherwise the filters (category, pricing bucket, min_trend_score) are
+    applied on the snapshot's indexes, `fields` selects a comma-separated
+    projection and `limit`/`cursor` page through the result. The cursor for
+    the next page is returned in the X-Next-Cursor header.
 
-        return JSONResponse(content=tools)
+    `ids` (comma-separated, at most MAX_PAGE_SIZE) fetches those tools in the
+    given order, e.g. for the Compare page; unknown ids are left out. It
+    cannot be combined with the filters or paging.
+    """
+    snapshot = get_catalog_snapshot()
+    if not snapshot.tools:
+        print("⚠️ No tools found in the database.")
+        raise HTTPException(status_code=404, detail="No tools found in the database.")
+
+    if all(param is None for param in (limit, cursor, fields, category, pricing, min_trend_score, ids)):
+        # Served from bytes built once per catalog version (ETag + gzip/brotli).
+        return tools_list_response.get(snapshot).to_response(request)
+
+    selected_fields = None
+    if fields is not None:
+        selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in selected_fields if field not in snapshot.fields]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+
+    if ids is not None:
+        if any(param is not None for param in (limit, cursor, category, pricing, min_trend_score)):
+            raise HTTPException(status_code=400, detail="ids cannot be combined with filters or paging.")
+        requested = list(dict.fromkeys(tool_id.strip() for tool_id in ids.split(",") if tool_id.strip()))
+        if len(requested) > MAX_PAGE_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request.")
+        positions = [snapshot.position_by_id[tool_id] for tool_id in requested if tool_id in snapshot.position_by_id]
+        # Full documents (as /api/tools/{id}) unless fields are selected;
+        # snapshot documents never carry embeddings
+        return JSONResponse(content=[
+            snapshot.documents[pos] if selected_fields is None else snapshot.project(pos, selected_fields)
+            for pos in positions
+        ])
+
+    if cursor is not None and limit is None:
+        limit = DEFAULT_PAGE_SIZE
+
+    positions = snapshot.filter_positions(category=category, pricing=pricing, min_trend_score=min_trend_score)
+    try:
+        page, next_cursor = snapshot.page(positions, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    except Exception as e:
-        print("❌ Error in /api/tools:", repr(e))
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return JSONResponse(content=[snapshot.project(pos, selected_fields) for pos in page], headers=headers)
 
 @app.get("/api/tools/{tool_id}")
 def get_tool_by_id(tool_id: str):
     if tools_collection is None:
         raise HTTPException(status_code=500, detail="Database connection not configured.")
-    tool = tools_collection.find_one({"id": tool_id}, {'_id': 0})
+    # Served from the snapshot's id map; Mongo is only asked for tools added
+    # since the last refresh (or while the catalog is still loading)
+    snapshot = catalog.snapshot if catalog is not None else None
+    if snapshot is not None and tool_id in snapshot.by_id:
+        return snapshot.by_id[tool_id]
+    tool = tools_collection.find_one({"id": tool_id}, {'_id': 0, EMBEDDING_FIELD: 0})
     if not tool:
         raise HTTPException(status_code=404, detail="Tool not found.")
     return tool
 
+@app.get("/api/tools/{tool_id}/similar")
+def get_similar_tools(tool_id: str, limit: int = Query(SIMILAR_K, ge=1, le=SIMILAR_K)):
+    """
+    Tools most similar to this one by description embedding, as in the
+    /api/tools list plus a cosine `score`. The neighbours are precomputed by
+    enrich_database.py; a tool it has not processed yet has none.
+    """
+    snapshot = get_catalog_snapshot()
+    tool = snapshot.by_id.get(tool_id)
+    if tool is None:
+        raise HTTPException(status_code=404, detail="Tool not found.")
+    similar = []
+    for neighbour in tool.get(SIMILAR_FIELD) or []:
+        position = snapshot.position_by_id.get(neighbour.get("id"))
+        if position is None:
+            continue  # removed from the catalog since the graph was built
+        similar.append({**snapshot.tools[position], "score": neighbour.get("score")})
+        if len(similar) == limit:
+            break
+    return similar
+
+@app.get("/api/facets")
+def get_facets(
+    q: Optional[str] = None,
+    category: Optional[str] = None,
+    pricing: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Faceted search for the filter bar: the ids of the tools matching the
+    keyword query `q` (BM25, best first, or fuzzy name/category matches
+    when no word is found), `category` and `pricing` bucket, plus live
+    category and pricing counts, in one call. Fetch the tools themselves
+    with /api/tools?ids=.
+    """
+    snapshot = get_catalog_snapshot()
+    if not facet_index.is_loaded:
+        raise HTTPException(status_code=503, detail="Tool catalog is still loading.")
+    ranked_ids = None
+    if q is not None and q.strip():
+        ranked_ids = [tool_id for tool_id, _ in hybrid_retriever.lexical(q, limit=len(snapshot))]
+    return facet_index.search(category=category, pricing=pricing, ranked_ids=ranked_ids, limit=limit, offset=offset)
+
+@app.get("/api/suggest")
+def get_suggestions(
+    q: str = Query(..., max_length=100),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+):
+    """
+    Typeahead for the search bar: tool names, categories and feature titles
+    starting with `q` (at the start of any word), most popular first. Each
+    suggestion has text, type ("tool", "category" or "feature") and, for
+    tools, the id. When nothing starts with `q`, close spellings are
+    suggested instead ("midjor" -> "Midjourney").
+    """
+    get_catalog_snapshot()
+    if not suggest_index.is_loaded:
+        raise HTTPException(status_code=503, detail="Tool catalog is still loading.")
+    suggestions = suggest_index.suggest(q, limit=limit)
+    if not suggestions:
+        suggestions = [
+            {key: match[key] for key in ("text", "type", "id")}
+            for match in fuzzy_index.matches(q, limit=limit, prefix=True)
+        ]
+    return suggestions
+
+@app.get("/api/insights")
+def get_insights(request: Request):
+    """
+    Aggregates for the Insights and Trends pages and the hero KPIs
+    (category counts, pricing distribution, top tools, release histograms),
+    precomputed per catalog version instead of per visitor.
+    """
+    get_catalog_snapshot()
+    response = insights_store.response
+    if response is None:
+        raise HTTPException(status_code=503, detail="Tool catalog is still loading.")
+    return response.to_response(request)
+
 def tool_helper(tool) -> dict:
     return {
         "id": str(tool["_id"]),
@@ -216,38 +644,53 @@ def tool_helper(tool) -> dict:
     }
 
 
+# --- Retrieval ---
+async def retrieve_tools(endpoint, query, limit, mode, vector_timeout=None):
+    """
+    Runs the hybrid retriever and records its stage timings. Returns
+    (ranking, query_embedding, timings) like HybridRetriever.retrieve().
+    """
+    ranking, query_embedding, timings = await hybrid_retriever.retrieve(
+        query, limit=limit, mode=mode, embed=query_encoder.aencode, executor=db_executor,
+        vector_timeout=vector_timeout,
+    )
+    for stage, seconds in timings.items():
+        retrieval_stage_seconds.labels(endpoint=endpoint, mode=mode, stage=stage).observe(seconds)
+    return ranking, query_embedding, timings
+
+
 # ---  CHATBOT ENDPOINT ---
 @app.post("/api/chatbot", response_model=ChatResponse)
-async def handle_chat(request: ChatRequest):
+async def handle_chat(request: ChatRequest, response: Response):
     """
-    Finds matching tools, sorts by popularity, and returns a detailed
-    response with name, release date, pricing, and website link.
+    Finds matching tools with the hybrid retriever (BM25 blended with
+    popularity, with a fuzzy fallback for misspellings, fused with vector
+    search) and returns a detailed response with name, release date,
+    pricing, and website link. Stage timings are sent in Server-Timing.
     """
-    if tools_collection is None:
+    if catalog is None or not catalog.snapshot.is_loaded:
         return {"reply": "Sorry, I can't connect to the database right now."}
 
-    user_message = request.message.lower()
-    keywords = user_message.split()
-    meaningful_keywords = [word for word in keywords if word.strip() not in STOP_WORDS]
+    # tokenize() drops STOP_WORDS and stems what is left
+    meaningful_keywords = tokenize(request.message)
 
     if not meaningful_keywords:
         return {"reply": "Please be a bit more specific about what you're looking for."}
 
-    query = {
-        "$or": [
-            {"name": {"$regex": "|".join(meaningful_keywords), "$options": "i"}},
-            {"description": {"$regex": "|".join(meaningful_keywords), "$options": "i"}},
-            {"keyFeatures": {"$regex": "|".join(meaningful_keywords), "$options": "i"}}
-        ]
-    }
-
     try:
-        found_tools = list(tools_collection.find(query).sort("popularity", -1).limit(3))
+        snapshot = catalog.snapshot
+        # Until the warm-up has loaded the embedding model only BM25 can run
+        mode = RETRIEVAL_MODE if embedding_model.is_loaded else "keyword"
+        matches, _, timings = await retrieve_tools(
+            "chatbot", request.message, 3, mode, vector_timeout=CHATBOT_VECTOR_TIMEOUT_MS / 1000,
+        )
+        response.headers["Server-Timing"] = server_timing(timings)
+        found_tools = [snapshot.by_id[tool_id] for tool_id, _ in matches if tool_id in snapshot.by_id]
 
         if not found_tools:
             return {"reply": f"Sorry, I couldn't find any tools related to your search. Try describing it differently."}
 
-        response_text = "Here are the top 3 most popular tools I found for you:\n\n---\n\n"
+        response_text = "Here are the top 3 tools I found for you:\n\n---\n\n"
         
         # ---  RESPONSE FORMATTING LOGIC ---
         for tool in found_tools:
@@ -269,7 +712,7 @@ async def handle_chat(request: ChatRequest):
         return {"reply": response_text}
 
     except Exception as e:
-        print(f"Database query failed: {e}")
+        print(f"Keyword search failed: {e}")
         return {"reply": "Sorry, something went wrong while searching for tools."}
 
 
@@ -288,6 +731,7 @@ def signup(user: UserCreate):
     del user_dict["password"]
     
     users_collection.insert_one(user_dict)
+    principal_cache.pop(user.email)
     return {"message": "Signup successful!"}
 
 # --- NEW: Login Endpoint (for getting a token) ---
@@ -296,8 +740,9 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
     if users_collection is None:
         raise HTTPException(status_code=500, detail="Database connection not configured.")
         
-    user = users_collection.find_one({"email": form_data.username}) # OAuth2 form uses 'username' for the first field
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    user = await run_in(db_executor, users_collection.find_one, {"email": form_data.username}) # OAuth2 form uses 'username' for the first field
+    # bcrypt is deliberately slow, keep it off the event loop
+    if not user or not await run_in(auth_executor, verify_password, form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -312,100 +757,250 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 # --- NEW: Example Protected Endpoint ---
 @app.get("/users/me")
 def read_users_me(current_user: dict = Depends(get_current_user)):
-    # The '_id' from MongoDB is not JSON serializable, so we remove it
-    current_user.pop('_id', None)
-    current_user.pop('hashed_password', None) # Don't send the hash back
-    return current_user
+    # The full document is only read here. '_id' is not JSON serializable,
+    # the hash must never be sent back and history has its own endpoint.
+    user = users_collection.find_one(
+        {"email": current_user["email"]},
+        {"_id": 0, "hashed_password": 0, "consultant_history": 0},
+    )
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 # Popular tools (sorted by popularity descending)
 @app.get("/tools/popular")
 def get_popular():
-    tools = list(tools_collection.find({}, {"_id": 0}).sort("popularity", -1).limit(10))
-    return tools
+    return get_catalog_snapshot().popular
 
 # Latest tools (sorted by trendScore descending)
 @app.get("/tools/latest")
 def get_latest():
-    tools = list(tools_collection.find({}, {"_id": 0}).sort("trendScore", -1).limit(10))
-    return tools
+    return get_catalog_snapshot().latest
 
 
-@app.post("/api/consultant")
-async def get_project_recommendation(query: ConsultantQuery, current_user: dict = Depends(get_current_user)):
+def save_consultant_history(email, prompt, recommendation_text):
+    # One document per conversation in the consultant_history collection
+    with consultant_stage_seconds.labels(stage="history_write").time():
+        consultant_history.add(email, prompt, recommendation_text)
+
+
+def check_consultant_dependencies():
     if (
         client is None or
-        gemini_model is None or
-        embedding_model is None or
-        users_collection is None  # must be checked with `is None`
+        llm_client is None or
+        users_collection is None or  # must be checked with `is None`
+        consultant_history is None
     ):
         raise HTTPException(status_code=500, detail="Missing required dependencies")
+    if not embedding_model.is_loaded:
+        raise HTTPException(
+            status_code=503,
+            detail="The AI Consultant is still warming up.",
+            headers={"Retry-After": "5"},
+        )
 
-    try:
-        # 1. RETRIEVAL
-        print(f"Received query from {current_user['email']}: {query.prompt}")
-        query_embedding = embedding_model.encode(query.prompt).tolist()
 
-        search_pipeline = [
-            {"$vectorSearch": {"index": "vector_index", "path": "description_embedding", "queryVector": query_embedding, "numCandidates": 100, "limit": 5}},
-            {"$project": {"name": 1, "description": 1, "website": 1, "categories": 1, "_id": 0}}
-        ]
-        
-        retrieved_tools = list(tools_collection.aggregate(search_pipeline))
-        print(f"Found {len(retrieved_tools)} relevant tools.")
-
-        if not retrieved_tools:
-            return {"recommendation": "I couldn't find any specific tools matching your request in the database."}
-
-        # 2. AUGMENTATION
-        context = "Relevant tools from our database:\n\n"
-        for tool in retrieved_tools:
-            context += f"- Tool: {tool.get('name')}\n  Description: {tool.get('description')}\n  Categories: {', '.join(tool.get('categories', []))}\n\n"
-
-        # 3. GENERATION
-        final_prompt = (
-            "You are an expert AI project consultant. A user wants to build: "
-            f"'{query.prompt}'.\n\n"
-            "Using ONLY the information from the context below, recommend a stack of 1-3 tools. "
-            "Explain WHY each tool is a good choice for their specific need. "
-            "Format your response in simple markdown. Do not mention the database or the context.\n\n"
-            f"Context:\n{context}"
-        )
-        
-        print("Generating recommendation with Gemini...")
-        response = gemini_model.generate_content(final_prompt)
-        recommendation_text = response.text
-
-        # Save conversation to user's history
-        conversation_entry = {
-            "prompt": query.prompt,
-            "recommendation": recommendation_text,
-            "timestamp": datetime.now(timezone.utc)
-        }
-        users_collection.update_one(
-            {"email": current_user["email"]},
-            {"$push": {"consultant_history": conversation_entry}}
+async def retrieve_tools_for_prompt(prompt):
+    """
+    Retrieves tools for the prompt in RETRIEVAL_MODE and returns
+    (query_embedding, retrieved_tools, timings); the embedding is None in
+    "keyword" mode.
+    """
+    with consultant_stage_seconds.labels(stage="retrieval").time():
+        ranking, query_embedding, timings = await retrieve_tools("consultant", prompt, 5, RETRIEVAL_MODE)
+    if "embedding" in timings:
+        consultant_stage_seconds.labels(stage="embedding").observe(timings["embedding"])
+    snapshot = catalog.snapshot
+    retrieved_tools = [
+        project_for_retrieval(snapshot.by_id[tool_id]) for tool_id, _ in ranking if tool_id in snapshot.by_id
+    ]
+    print(f"Found {len(retrieved_tools)} relevant tools.")
+    return query_embedding, retrieved_tools, timings
+
+
+def build_consultant_prompt(prompt, retrieved_tools):
+    context = "Relevant tools from our database:\n\n"
+    for tool in retrieved_tools:
+        context += f"- Tool: {tool.get('name')}\n  Description: {tool.get('description')}\n  Categories: {', '.join(tool.get('categories', []))}\n\n"
+
+    return (
+        "You are an expert AI project consultant. A user wants to build: "
+        f"'{prompt}'.\n\n"
+        "Using ONLY the information from the context below, recommend a stack of 1-3 tools. "
+        "Explain WHY each tool is a good choice for their specific need. "
+        "Format your response in simple markdown. Do not mention the database or the context.\n\n"
+        f"Context:\n{context}"
+    )
+
+
+NO_TOOLS_FOUND_REPLY = "I couldn't find any specific tools matching your request in the database."
+
+
+async def acquire_consultant_slot(email):
+    """Admits one consultant request or answers 429/503 with Retry-After."""
+    try:
+        return await consultant_admission.acquire(email)
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=e.detail,
+            headers={"Retry-After": str(e.retry_after)},
         )
 
-        return {"recommendation": recommendation_text}
 
-    except Exception as e:
-        print(f"An error occurred in the consultant endpoint: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+@asynccontextmanager
+async def consultant_slot(email):
+    token = await acquire_consultant_slot(email)
+    try:
+        yield
+    finally:
+        consultant_admission.release(email, token)
+
+
+@app.post("/api/consultant")
+async def get_project_recommendation(
+    query: ConsultantQuery, response: Response, current_user: dict = Depends(get_current_user)
+):
+    check_consultant_dependencies()
+
+    async with consultant_slot(current_user["email"]):
+        try:
+            # 1. RETRIEVAL
+            print(f"Received query from {current_user['email']}: {query.prompt}")
+            query_embedding, retrieved_tools, timings = await retrieve_tools_for_prompt(query.prompt)
+            response.headers["Server-Timing"] = server_timing(timings)
+
+            if not retrieved_tools:
+                return {"recommendation": NO_TOOLS_FOUND_REPLY}
+
+            # Reuse a recent answer for a near-identical prompt over the same tools
+            tool_ids = [tool.get("id") for tool in retrieved_tools]
+            catalog_version = catalog.snapshot.version if catalog is not None else None
+            recommendation_text = None
+            if query_embedding is not None:  # no embedding in "keyword" mode
+                with consultant_stage_seconds.labels(stage="cache_lookup").time():
+                    recommendation_text = semantic_cache.lookup(query_embedding, tool_ids, catalog_version)
+            if recommendation_text is not None:
+                print("Semantic cache hit, skipping generation.")
+                await run_in(db_executor, save_consultant_history, current_user["email"], query.prompt, recommendation_text)
+                return {"recommendation": recommendation_text}
+
+            # 2. AUGMENTATION
+            with consultant_stage_seconds.labels(stage="prompt_build").time():
+                final_prompt = build_consultant_prompt(query.prompt, retrieved_tools)
+
+            # 3. GENERATION
+            print("Generating recommendation with the LLM...")
+            with consultant_stage_seconds.labels(stage="llm").time():
+                recommendation_text = await llm_client.agenerate(final_prompt)
+            if query_embedding is not None:
+                semantic_cache.store(query_embedding, tool_ids, recommendation_text, catalog_version)
+
+            await run_in(db_executor, save_consultant_history, current_user["email"], query.prompt, recommendation_text)
+
+            return {"recommendation": recommendation_text}
+
+        except Exception as e:
+            print(f"An error occurred in the consultant endpoint: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+def sse_event(event, data):
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/api/consultant/stream")
+async def stream_project_recommendation(query: ConsultantQuery, current_user: dict = Depends(get_current_user)):
+    """
+    Same as /api/consultant, but answers with Server-Sent Events: a `tools`
+    event with the retrieved tools as soon as retrieval is done, then one
+    `token` event per generated chunk and a final `done` event. The history
+    entry is saved once the stream has completed.
+    """
+    check_consultant_dependencies()
+    # Taken before the response starts so rejections are plain 429/503s;
+    # held until the stream has finished
+    slot_token = await acquire_consultant_slot(current_user["email"])
+    print(f"Received streaming query from {current_user['email']}: {query.prompt}")
+
+    async def event_stream():
+        try:
+            query_embedding, retrieved_tools, _ = await retrieve_tools_for_prompt(query.prompt)
+            yield sse_event("tools", retrieved_tools)
+
+            if not retrieved_tools:
+                yield sse_event("token", {"text": NO_TOOLS_FOUND_REPLY})
+                yield sse_event("done", {"cached": False})
+                return
+
+            tool_ids = [tool.get("id") for tool in retrieved_tools]
+            catalog_version = catalog.snapshot.version if catalog is not None else None
+            cached_text = None
+            if query_embedding is not None:  # no embedding in "keyword" mode
+                with consultant_stage_seconds.labels(stage="cache_lookup").time():
+                    cached_text = semantic_cache.lookup(query_embedding, tool_ids, catalog_version)
+            if cached_text is not None:
+                yield sse_event("token", {"text": cached_text})
+                await run_in(db_executor, save_consultant_history, current_user["email"], query.prompt, cached_text)
+                yield sse_event("done", {"cached": True})
+                return
+
+            with consultant_stage_seconds.labels(stage="prompt_build").time():
+                final_prompt = build_consultant_prompt(query.prompt, retrieved_tools)
+            chunks = []
+            llm_start = time.perf_counter()
+            async for chunk in llm_client.astream(final_prompt):
+                if not chunks:
+                    consultant_stage_seconds.labels(stage="llm_first_token").observe(time.perf_counter() - llm_start)
+                chunks.append(chunk)
+                yield sse_event("token", {"text": chunk})
+            consultant_stage_seconds.labels(stage="llm").observe(time.perf_counter() - llm_start)
+
+            recommendation_text = "".join(chunks)
+            if query_embedding is not None:
+                semantic_cache.store(query_embedding, tool_ids, recommendation_text, catalog_version)
+            await run_in(db_executor, save_consultant_history, current_user["email"], query.prompt, recommendation_text)
+            yield sse_event("done", {"cached": False})
+
+        except Exception as e:
+            print(f"An error occurred in the streaming consultant endpoint: {e}")
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            consultant_admission.release(current_user["email"], slot_token)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # --- NEW: Endpoint to fetch a user's conversation history ---
 @app.get("/api/consultant/history")
-async def get_consultant_history(current_user: dict = Depends(get_current_user)):
-    if users_collection is None:
+async def get_consultant_history(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Returns the user's conversations newest first, `limit` at a time. The
+    cursor for the next (older) page is returned in the X-Next-Cursor header.
+    """
+    if consultant_history is None:
         raise HTTPException(status_code=500, detail="Database connection not configured.")
 
-    # The user object from get_current_user already contains the history
-    history = current_user.get("consultant_history", [])
-    
-    # Sort history by timestamp, newest first
-    sorted_history = sorted(history, key=lambda x: x['timestamp'], reverse=True)
+    try:
+        entries, next_cursor = await run_in(
+            db_executor, consultant_history.page, current_user["email"], limit, cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return sorted_history
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return entries
 
 # Add this model at the top with your other Pydantic models
 class ResetPasswordRequest(BaseModel):
@@ -449,6 +1044,7 @@ def reset_password(payload: ResetPasswordRequest):
     )
     
     print(f"✅ MongoDB update - Matched: {result.matched_count}, Modified: {result.modified_count}")
+    principal_cache.pop(payload.email)
     
     # Verify the update worked
     updated_user = users_collection.find_one({"email": payload.email})
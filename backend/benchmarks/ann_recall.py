@@ -0,0 +1,102 @@
+"""
+Measures recall@k and query latency of the IVF ANN index against exact search.
+
+Run from the backend folder:
+
+    python benchmarks/ann_recall.py                      # saved index in ANN_INDEX_DIR
+    python benchmarks/ann_recall.py --synthetic 200000   # clustered random vectors
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import IVFIndex, normalize_rows  # noqa: E402
+
+
+def synthetic_vectors(count, dim, clusters, seed):
+    """Gaussian blobs on the unit sphere, a rough stand-in for text embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((clusters, dim)).astype(np.float32))
+    labels = rng.integers(0, clusters, size=count)
+    noise = rng.standard_normal((count, dim)).astype(np.float32) * (1.4 / np.sqrt(dim))
+    return normalize_rows(centers[labels] + noise)
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--index-dir", default=os.getenv("ANN_INDEX_DIR", "ann_index"))
+    parser.add_argument("--synthetic", type=int, default=0, help="benchmark N synthetic vectors instead")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--n-probe", type=int, nargs="*", help="n_probe values to sweep")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    build_seconds = None
+    if args.synthetic:
+        vectors = synthetic_vectors(args.synthetic, args.dim, max(16, args.synthetic // 500), args.seed)
+        ids = [str(i) for i in range(len(vectors))]
+        start = time.perf_counter()
+        index = IVFIndex.build(ids, vectors)
+        build_seconds = time.perf_counter() - start
+    else:
+        index = IVFIndex.load(args.index_dir)
+        vectors = normalize_rows(np.asarray(index.vectors, dtype=np.float32))
+        ids = index.ids
+
+    # Queries are perturbed copies of stored vectors, like a prompt close to a tool description.
+    rng = np.random.default_rng(args.seed + 1)
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = normalize_rows(vectors[picks] + rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32) * 0.02)
+
+    exact_results, exact_times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = vectors @ query
+        top = np.argpartition(-scores, args.k - 1)[:args.k]
+        exact_results.append({ids[row] for row in top})
+        exact_times.append(time.perf_counter() - start)
+
+    sweep = args.n_probe or sorted({1, index.n_probe // 2 or 1, index.n_probe, index.n_probe * 2, index.n_probe * 4})
+    report = {
+        "vectors": len(vectors),
+        "dim": int(vectors.shape[1]),
+        "nLists": index.n_lists,
+        "k": args.k,
+        "queries": len(queries),
+        "buildSeconds": round(build_seconds, 3) if build_seconds is not None else None,
+        "exact": {"p50Ms": percentile_ms(exact_times, 50), "p95Ms": percentile_ms(exact_times, 95)},
+        "ann": [],
+    }
+    for n_probe in sweep:
+        if n_probe > index.n_lists:
+            continue
+        hits, times = 0, []
+        for query, expected in zip(queries, exact_results):
+            start = time.perf_counter()
+            found = index.search(query, k=args.k, n_probe=n_probe)
+            times.append(time.perf_counter() - start)
+            hits += len(expected & {tool_id for tool_id, _ in found})
+        report["ann"].append({
+            "nProbe": n_probe,
+            f"recall@{args.k}": round(hits / (len(queries) * args.k), 4),
+            "p50Ms": percentile_ms(times, 50),
+            "p95Ms": percentile_ms(times, 95),
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
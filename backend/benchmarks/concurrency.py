@@ -0,0 +1,134 @@
+"""
+Checks that cheap endpoints stay fast while slow consultant calls are in flight.
+
+Measures /api/tools (a page) and /api/chatbot latency twice: on an idle
+server, then while --consultant-workers threads (spread over --users
+accounts) keep /api/consultant busy. Calls turned away by admission control
+(429/503) are counted, and the server's consultant_* metrics are included.
+Start the API with a slow fake LLM first, for example:
+
+    LLM_BACKEND=fake FAKE_LLM_DELAY_SECONDS=2 SEMANTIC_CACHE_THRESHOLD=2 uvicorn app:app --port 8000
+
+then run from the backend folder:
+
+    python benchmarks/concurrency.py --consultant-workers 32
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from consultant_stream import get_token  # noqa: E402
+
+CHAT_MESSAGES = ["image generator", "video editing", "write blog posts", "customer support chatbot"]
+
+
+def consultant_metrics(base_url):
+    """The consultant_* samples of /metrics (admission control), by series."""
+    with urllib.request.urlopen(f"{base_url}/metrics") as response:
+        lines = response.read().decode("utf-8").splitlines()
+    samples = {}
+    for line in lines:
+        if line.startswith("consultant_"):
+            series, _, value = line.rpartition(" ")
+            samples[series] = float(value)
+    return samples
+
+
+def timed_request(url, data=None, headers=None):
+    request = urllib.request.Request(url, data=data, headers=headers or {}, method="POST" if data else "GET")
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+def measure_cheap_endpoints(base_url, samples):
+    tools_times, chat_times = [], []
+    for i in range(samples):
+        tools_times.append(timed_request(f"{base_url}/api/tools?limit=20"))
+        body = json.dumps({"message": CHAT_MESSAGES[i % len(CHAT_MESSAGES)]}).encode("utf-8")
+        chat_times.append(timed_request(f"{base_url}/api/chatbot", body, {"Content-Type": "application/json"}))
+    return {"tools": summarize(tools_times), "chatbot": summarize(chat_times)}
+
+
+def summarize(samples):
+    return {
+        "p50Ms": round(float(np.percentile(samples, 50)) * 1000, 2),
+        "p95Ms": round(float(np.percentile(samples, 95)) * 1000, 2),
+        "p99Ms": round(float(np.percentile(samples, 99)) * 1000, 2),
+    }
+
+
+def consultant_load(base_url, token, stop_event, completed, rejected):
+    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    while not stop_event.is_set():
+        body = json.dumps({"prompt": f"build a chatbot ({uuid.uuid4().hex[:8]})"}).encode("utf-8")
+        try:
+            timed_request(f"{base_url}/api/consultant", body, headers)
+            completed.append(1)
+        except urllib.error.HTTPError as e:
+            if e.code not in (429, 503):
+                print(f"consultant request failed: {e}", file=sys.stderr)
+                continue
+            rejected.append(e.code)
+            time.sleep(0.1)  # rejections are instant, do not spin on them
+        except Exception as e:
+            print(f"consultant request failed: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument("--consultant-workers", type=int, default=16)
+    parser.add_argument("--users", type=int, default=8, help="accounts the consultant workers are spread over")
+    args = parser.parse_args()
+
+    name, domain = args.email.split("@")
+    tokens = [get_token(args.base_url, f"{name}+{i}@{domain}", args.password) for i in range(args.users)]
+    idle = measure_cheap_endpoints(args.base_url, args.samples)
+
+    stop_event, completed, rejected = threading.Event(), [], []
+    workers = [
+        threading.Thread(
+            target=consultant_load,
+            args=(args.base_url, tokens[i % len(tokens)], stop_event, completed, rejected),
+            daemon=True,
+        )
+        for i in range(args.consultant_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    time.sleep(1)  # let the consultant calls pile up
+    loaded = measure_cheap_endpoints(args.base_url, args.samples)
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=120)
+
+    admission = consultant_metrics(args.base_url)
+
+    print(json.dumps({
+        "consultantWorkers": args.consultant_workers,
+        "users": args.users,
+        "consultantCallsCompleted": len(completed),
+        "consultantCallsRejected": {str(code): rejected.count(code) for code in (429, 503)},
+        "admission": admission,
+        "idle": idle,
+        "underConsultantLoad": loaded,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compares time-to-first-byte and total latency of /api/consultant/stream with
+the blocking /api/consultant endpoint.
+
+Start the API with the fake streaming LLM first, for example:
+
+    LLM_BACKEND=fake FAKE_LLM_DELAY_SECONDS=2 SEMANTIC_CACHE_THRESHOLD=2 uvicorn app:app --port 8000
+
+then run from the backend folder:
+
+    python benchmarks/consultant_stream.py --requests 20
+
+A threshold above 1 disables semantic cache hits, so every request reaches
+the LLM. Prompts are made unique as well, for the query-embedding cache.
+"""
+import argparse
+import http.client
+import json
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+
+import numpy as np
+
+PROMPTS = [
+    "build a customer support chatbot",
+    "generate marketing images for social media",
+    "transcribe and summarize meetings",
+    "write SEO blog posts",
+    "edit short videos for TikTok",
+]
+
+
+def get_token(base_url, email, password):
+    """Signs the benchmark user up if needed and returns a bearer token."""
+    signup = urllib.request.Request(
+        f"{base_url}/signup",
+        data=json.dumps({"email": email, "password": password}).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        urllib.request.urlopen(signup).read()
+    except urllib.error.HTTPError as e:
+        if e.code != 400:  # 400 means the user already exists
+            raise
+    form = urllib.parse.urlencode({"username": email, "password": password}).encode("utf-8")
+    with urllib.request.urlopen(urllib.request.Request(f"{base_url}/token", data=form, method="POST")) as response:
+        return json.load(response)["access_token"]
+
+
+def timed_post(base_url, path, token, prompt):
+    """
+    POSTs a prompt and reads the response in small pieces. Returns the time to
+    the first body byte, to the first `event: token` line (streams only) and
+    to the end of the body, in seconds.
+    """
+    url = urllib.parse.urlparse(base_url)
+    connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=120)
+    body = json.dumps({"prompt": prompt})
+    start = time.perf_counter()
+    connection.request("POST", path, body=body, headers={
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {token}",
+    })
+    response = connection.getresponse()
+    if response.status != 200:
+        raise RuntimeError(f"{path} returned {response.status}: {response.read()[:200]!r}")
+
+    first_byte = first_token = None
+    received = b""
+    while True:
+        chunk = response.read1(1024)
+        if not chunk:
+            break
+        now = time.perf_counter() - start
+        if first_byte is None:
+            first_byte = now
+        received += chunk
+        if first_token is None and b"event: token" in received:
+            first_token = now
+    total = time.perf_counter() - start
+    connection.close()
+    return first_byte, first_token, total
+
+
+def summarize(samples):
+    samples = [s for s in samples if s is not None]
+    if not samples:
+        return None
+    return {
+        "p50Ms": round(float(np.percentile(samples, 50)) * 1000, 2),
+        "p95Ms": round(float(np.percentile(samples, 95)) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", default="bench@example.com")
+    parser.add_argument("--password", default="bench-password")
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    token = get_token(args.base_url, args.email, args.password)
+    results = {"blocking": ([], [], []), "stream": ([], [], [])}
+    for i in range(args.requests):
+        for mode, path in (("blocking", "/api/consultant"), ("stream", "/api/consultant/stream")):
+            prompt = f"{PROMPTS[i % len(PROMPTS)]} ({uuid.uuid4().hex[:8]})"
+            for samples, value in zip(results[mode], timed_post(args.base_url, path, token, prompt)):
+                samples.append(value)
+
+    report = {"requests": args.requests}
+    for mode, (first_bytes, first_tokens, totals) in results.items():
+        report[mode] = {
+            "timeToFirstByte": summarize(first_bytes),
+            "timeToFirstToken": summarize(first_tokens),
+            "total": summarize(totals),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Accuracy and performance check of the embedding backends.
+
+Each backend runs in its own process so cold start (imports + model load)
+and resident memory are measured in isolation. Every backend embeds the
+catalog (frontend_ready_tools.json) and is compared with the "torch"
+reference: cosine agreement per tool and overlap of each tool's top-5
+neighbours. Run from the backend folder after export_onnx_model.py:
+
+    python benchmarks/embedding_backend_bench.py
+    python benchmarks/embedding_backend_bench.py --backends torch onnx-int8 --limit 300
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+DEFAULT_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", os.path.join(BACKEND_DIR, "onnx_model"))
+
+
+def load_texts(limit):
+    from embedding_backends import tool_embedding_text
+    with open(os.path.join(BACKEND_DIR, "frontend_ready_tools.json"), "r", encoding="utf-8") as f:
+        tools = json.load(f)
+    return [tool_embedding_text(tool) for tool in tools[:limit]]
+
+
+def run_child(backend, model_dir, limit, output_path):
+    """Loads one backend, embeds the catalog and reports timings as JSON."""
+    start = time.perf_counter()
+    import numpy as np
+    from embedding_backends import load_embedding_backend
+    model = load_embedding_backend(backend, model_dir)
+    cold_start = time.perf_counter() - start
+
+    texts = load_texts(limit)
+    model.encode(texts[:4])  # warm-up
+
+    single = []
+    for text in texts[:100]:
+        t = time.perf_counter()
+        model.encode(text)
+        single.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    vectors = np.asarray(model.encode(texts, batch_size=32), dtype=np.float32)
+    batch_seconds = time.perf_counter() - t
+    np.save(output_path, vectors)
+
+    print(json.dumps({
+        "coldStartSeconds": round(cold_start, 3),
+        # ru_maxrss is in KiB on Linux
+        "maxRssMb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "singleEncodeP50Ms": round(float(np.percentile(single, 50)) * 1000, 2),
+        "singleEncodeP95Ms": round(float(np.percentile(single, 95)) * 1000, 2),
+        "catalogTextsPerSecond": round(len(texts) / batch_seconds, 1),
+    }))
+
+
+def agreement(reference, candidate, k=5):
+    import numpy as np
+    cosines = np.sum(reference * candidate, axis=1) / (
+        np.linalg.norm(reference, axis=1) * np.linalg.norm(candidate, axis=1)
+    )
+    ref_sim, cand_sim = reference @ reference.T, candidate @ candidate.T
+    np.fill_diagonal(ref_sim, -np.inf)
+    np.fill_diagonal(cand_sim, -np.inf)
+    ref_top = np.argsort(-ref_sim, axis=1)[:, :k]
+    cand_top = np.argsort(-cand_sim, axis=1)[:, :k]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])
+    return {
+        "meanCosine": round(float(cosines.mean()), 5),
+        "minCosine": round(float(cosines.min()), 5),
+        f"top{k}NeighbourOverlap": round(float(overlap), 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--model-dir", default=DEFAULT_MODEL_DIR)
+    parser.add_argument("--limit", type=int, default=100000, help="embed at most this many tools")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.model_dir, args.limit, args.output)
+        return
+
+    import numpy as np
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    report = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in backends:
+            output = os.path.join(tmp, f"{backend}.npy")
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", backend,
+                 "--model-dir", args.model_dir, "--limit", str(args.limit), "--output", output],
+                capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                report[backend] = {"error": result.stderr.strip().splitlines()[-1:]}
+                continue
+            report[backend] = json.loads(result.stdout.strip().splitlines()[-1])
+            if backend != "torch" and "error" not in report["torch"]:
+                report[backend]["agreementWithTorch"] = agreement(
+                    np.load(os.path.join(tmp, "torch.npy")), np.load(output)
+                )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Compares the per-request encode path with the micro-batching BatchingEncoder.
+
+Fires --requests concurrent single-prompt encodes (at most --concurrency in
+flight) through both paths and reports throughput and latency percentiles.
+Run from the backend folder:
+
+    python benchmarks/embedding_batching.py --concurrency 64
+    python benchmarks/embedding_batching.py --fake   # no model download needed
+
+--fake uses a stand-in whose cost is a fixed overhead per call plus a small
+per-item cost, which is the shape that makes batching pay off.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings import BatchingEncoder  # noqa: E402
+from executors import create_executor, run_in  # noqa: E402
+
+
+class FakeModel:
+    def __init__(self, call_overhead_ms=8.0, per_item_ms=0.5, dim=384):
+        self.call_overhead = call_overhead_ms / 1000
+        self.per_item = per_item_ms / 1000
+        self.dim = dim
+
+    def encode(self, texts):
+        batch = [texts] if isinstance(texts, str) else texts
+        time.sleep(self.call_overhead + self.per_item * len(batch))
+        vectors = np.ones((len(batch), self.dim), dtype=np.float32)
+        return vectors[0] if isinstance(texts, str) else vectors
+
+
+async def drive(encode, prompts, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(prompt):
+        async with semaphore:
+            start = time.perf_counter()
+            await encode(prompt)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(prompt) for prompt in prompts))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughputPerSecond": round(len(prompts) / elapsed, 1),
+        "p50Ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p99Ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+    }
+
+
+async def main_async(args):
+    if args.fake:
+        model = FakeModel()
+    else:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer("all-MiniLM-L6-v2")
+
+    executor = create_executor(args.workers, "bench-cpu")
+    prompts = [f"build an ai tool for use case number {i}" for i in range(args.requests)]
+    model.encode(prompts[:8])  # warm-up
+
+    per_request = await drive(lambda prompt: run_in(executor, model.encode, prompt), prompts, args.concurrency)
+    batcher = BatchingEncoder(model, executor, max_batch_size=args.batch_size, max_wait_ms=args.wait_ms)
+    batched = await drive(batcher.encode, prompts, args.concurrency)
+    executor.shutdown()
+
+    return {
+        "model": "fake" if args.fake else "all-MiniLM-L6-v2",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "perRequest": per_request,
+        "batched": {**batched, **batcher.stats(), "maxBatchSize": args.batch_size, "maxWaitMs": args.wait_ms},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5)
+    parser.add_argument("--fake", action="store_true", help="use a stand-in model instead of MiniLM")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
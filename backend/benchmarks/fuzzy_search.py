@@ -0,0 +1,131 @@
+"""
+Measures the trigram fuzzy index (fuzzy.py) on misspelled queries at
+several catalog sizes.
+
+The catalog is frontend_ready_tools.json, grown to 10x and 100x by adding
+copies of every tool whose names are lightly mutated ("Midjourney" ->
+"Midjourney Vx 17"), so the extra entries share most of their trigrams
+with the real ones, the worst case for candidate generation. Queries are
+real tool names and categories with one or two typos. Run from the backend
+folder:
+
+    python benchmarks/fuzzy_search.py
+    python benchmarks/fuzzy_search.py --scales 1 10 100 --queries 500
+
+Reports build time, p50/p95/p99 latency and how often the intended tool
+or category is the top match.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import string
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from catalog import CatalogSnapshot  # noqa: E402
+from fuzzy import FuzzyIndex  # noqa: E402
+
+
+def load_tools():
+    with open(os.path.join(BACKEND_DIR, "frontend_ready_tools.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def grow(tools, scale, rng):
+    """The tools plus scale - 1 copies of each with mutated names and ids."""
+    grown = list(tools)
+    for copy in range(1, scale):
+        for tool in tools:
+            suffix = "".join(rng.choice(string.ascii_lowercase) for _ in range(2))
+            grown.append({
+                **tool,
+                "id": f"{tool['id']}-{copy}",
+                "name": f"{tool.get('name') or ''} {suffix.title()} {copy}",
+            })
+    return grown
+
+
+def misspell(text, rng, typos):
+    """Applies typos random edits: swap, drop, double or replace a letter."""
+    chars = list(text)
+    for _ in range(typos):
+        letters = [i for i, char in enumerate(chars) if char.isalpha()]
+        if len(letters) < 4:
+            break
+        i = rng.choice(letters[1:-1])
+        edit = rng.choice(["swap", "drop", "double", "replace"])
+        if edit == "swap" and i + 1 < len(chars):
+            chars[i], chars[i + 1] = chars[i + 1], chars[i]
+        elif edit == "drop":
+            del chars[i]
+        elif edit == "double":
+            chars.insert(i, chars[i])
+        else:
+            chars[i] = rng.choice(string.ascii_lowercase)
+    return "".join(chars)
+
+
+def make_queries(tools, count, rng):
+    """[(query, expected text), ...] from names and categories of 5+ letters."""
+    names = sorted({tool["name"] for tool in tools if tool.get("name") and len(tool["name"]) >= 5})
+    categories = sorted({c for tool in tools for c in tool.get("categories") or [] if len(c) >= 5})
+    queries = []
+    for _ in range(count):
+        expected = rng.choice(names) if rng.random() < 0.7 else rng.choice(categories)
+        queries.append((misspell(expected, rng, 1 if len(expected) < 10 else 2), expected))
+    return queries
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 4)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100], help="catalog size multipliers")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tools = load_tools()
+    queries = make_queries(tools, args.queries, random.Random(args.seed))
+    report = {"baseTools": len(tools), "queries": len(queries), "results": []}
+    for scale in args.scales:
+        snapshot = CatalogSnapshot(grow(tools, scale, random.Random(args.seed + scale)), version=str(scale), loaded_at=time.time())
+        index = FuzzyIndex()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):  # stdout is only the JSON report
+            index.update(snapshot)
+        build_seconds = time.perf_counter() - start
+
+        times, top1, found = [], 0, 0
+        for query, expected in queries:
+            start = time.perf_counter()
+            matches = index.matches(query, limit=5)
+            times.append(time.perf_counter() - start)
+            texts = [match["text"] for match in matches]
+            top1 += bool(texts) and texts[0] == expected
+            found += expected in texts
+        report["results"].append({
+            "scale": scale,
+            "tools": len(snapshot),
+            "buildSeconds": round(build_seconds, 3),
+            "p50Ms": percentile_ms(times, 50),
+            "p95Ms": percentile_ms(times, 95),
+            "p99Ms": percentile_ms(times, 99),
+            "top1": round(top1 / len(queries), 4),
+            "top5": round(found / len(queries), 4),
+        })
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Reproducible load test for the API with local stand-ins.
+
+By default it starts its own server in a child process with no external
+services: MongoDB is replaced by mongomock (MONGO_URI=mongomock://) seeded
+from frontend_ready_tools.json, embeddings come from the "hashing" backend
+and answers from the fake LLM. It then drives a weighted mix of tool list,
+tool detail, chatbot, consultant and login requests (plus "compare", a
+batch lookup, on request) from --concurrency workers for --duration
+seconds. Run from the backend folder:
+
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 64 --duration 60 --llm-delay 1.0
+    python benchmarks/load_test.py --mix tools=1,consultant=1 --output before.json
+
+--base-url targets a server that is already running instead (the user
+accounts are created through /signup). Needs mongomock and httpx.
+
+Reports throughput, p50/p95/p99 latency and error rates per request type.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = "tools=30,tools_page=15,detail=20,chatbot=15,consultant=10,login=10"
+CHAT_MESSAGES = [
+    "image generator", "video editing", "write blog posts", "customer support chatbot",
+    "code assistant", "music generation", "presentation slides", "meeting notes",
+]
+CONSULTANT_PROMPTS = [
+    "a support chatbot for an online shop", "an app that turns podcasts into blog posts",
+    "an AI tutor for high-school maths", "a tool that edits product videos",
+    "automated meeting summaries for a sales team", "a code review assistant",
+    "marketing images for social media", "a voice assistant for a call centre",
+]
+PASSWORD = "load-test-password"
+
+
+# --- Server side: runs in the child process ---
+
+def seed_tools(tools_collection, embedding_model):
+    from embedding_backends import tool_embedding_text
+    with open(os.path.join(BACKEND_DIR, "frontend_ready_tools.json"), "r", encoding="utf-8") as f:
+        tools = json.load(f)
+    vectors = embedding_model.encode([tool_embedding_text(tool) for tool in tools])
+    for tool, vector in zip(tools, vectors):
+        tool["description_embedding"] = vector.tolist()
+    tools_collection.insert_many(tools)
+    return len(tools)
+
+
+def serve(port, llm_delay):
+    os.environ.update({
+        "MONGO_URI": "mongomock://",
+        "EMBEDDING_BACKEND": "hashing",
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_DELAY_SECONDS": str(llm_delay),
+        "VECTOR_RETRIEVER": "local",
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    import uvicorn
+    import app
+
+    print(f"Seeded {seed_tools(app.tools_collection, app.embedding_model)} tools.")
+    uvicorn.run(app.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- Client side ---
+
+def parse_mix(mix):
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        if name not in REQUEST_TYPES:
+            raise SystemExit(f"Unknown request type in --mix: {name} (choose from {', '.join(REQUEST_TYPES)})")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+async def tools_request(client, state, rng):
+    return await client.get("/api/tools", headers={"Accept-Encoding": "gzip"})
+
+
+async def tools_page_request(client, state, rng):
+    category = rng.choice(state["categories"]) if state["categories"] else None
+    params = {"limit": 20, "fields": "id,name,pricingModel,categories"}
+    if category:
+        params["category"] = category
+    return await client.get("/api/tools", params=params)
+
+
+async def detail_request(client, state, rng):
+    return await client.get(f"/api/tools/{rng.choice(state['tool_ids'])}")
+
+
+async def compare_request(client, state, rng):
+    return await client.get("/api/tools", params={"ids": ",".join(rng.sample(state["tool_ids"], 3))})
+
+
+async def chatbot_request(client, state, rng):
+    return await client.post("/api/chatbot", json={"message": rng.choice(CHAT_MESSAGES)})
+
+
+async def consultant_request(client, state, rng):
+    token = rng.choice(state["tokens"])
+    return await client.post(
+        "/api/consultant",
+        json={"prompt": rng.choice(CONSULTANT_PROMPTS)},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+async def login_request(client, state, rng):
+    email = rng.choice(state["emails"])
+    return await client.post("/token", data={"username": email, "password": PASSWORD})
+
+
+REQUEST_TYPES = {
+    "tools": tools_request,
+    "tools_page": tools_page_request,
+    "detail": detail_request,
+    "compare": compare_request,
+    "chatbot": chatbot_request,
+    "consultant": consultant_request,
+    "login": login_request,
+}
+
+
+async def prepare(client, users):
+    tools = (await client.get("/api/tools")).json()
+    emails = [f"load-test-{i}@example.com" for i in range(users)]
+    tokens = []
+    for email in emails:
+        await client.post("/signup", json={"email": email, "password": PASSWORD})  # 400 if it exists
+        response = await client.post("/token", data={"username": email, "password": PASSWORD})
+        response.raise_for_status()
+        tokens.append(response.json()["access_token"])
+    return {
+        "tool_ids": [tool["id"] for tool in tools],
+        "categories": sorted({category for tool in tools for category in tool.get("categories", [])}),
+        "emails": emails,
+        "tokens": tokens,
+    }
+
+
+def summarize(samples, elapsed):
+    latencies = [latency for latency, _ in samples]
+    statuses = {}
+    for _, status_code in samples:
+        statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+    errors = sum(count for status_code, count in statuses.items() if not status_code.startswith(("2", "3")))
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 1),
+        "p50Ms": round(float(np.percentile(latencies, 50)) * 1000, 2),
+        "p95Ms": round(float(np.percentile(latencies, 95)) * 1000, 2),
+        "p99Ms": round(float(np.percentile(latencies, 99)) * 1000, 2),
+        "errorRate": round(errors / len(samples), 4),
+        "statuses": statuses,
+    }
+
+
+async def run_load(args, base_url):
+    import httpx
+
+    weights = parse_mix(args.mix)
+    names, probabilities = list(weights), list(weights.values())
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        state = await prepare(client, args.users)
+        samples = {name: [] for name in names}
+        deadline = time.perf_counter() + args.duration
+
+        async def worker(seed):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, probabilities)[0]
+                start = time.perf_counter()
+                try:
+                    response = await REQUEST_TYPES[name](client, state, rng)
+                    status_code = response.status_code
+                except httpx.HTTPError as e:
+                    status_code = type(e).__name__
+                samples[name].append((time.perf_counter() - start, status_code))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    all_samples = [sample for name in names for sample in samples[name]]
+    return {
+        "overall": summarize(all_samples, elapsed),
+        "byType": {name: summarize(samples[name], elapsed) for name in names if samples[name]},
+        "elapsedSeconds": round(elapsed, 2),
+    }
+
+
+def wait_until_ready(base_url, timeout, server=None):
+    import httpx
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server is not None and server.poll() is not None:
+            raise SystemExit("The load-test server exited during startup.")
+        try:
+            if httpx.get(f"{base_url}/readyz", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"{base_url} was not ready after {timeout}s.")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted request types, name=weight,...")
+    parser.add_argument("--users", type=int, default=16, help="accounts used for consultant and login")
+    parser.add_argument("--llm-delay", type=float, default=0.5, help="fake LLM latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--base-url", help="use a running server instead of starting one")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.port, args.llm_delay)
+        return
+
+    server = None
+    base_url = args.base_url or f"http://127.0.0.1:{args.port}"
+    if args.base_url is None:
+        server = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve", "--port", str(args.port),
+             "--llm-delay", str(args.llm_delay)],
+            cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+    try:
+        wait_until_ready(base_url, timeout=120, server=server)
+        results = asyncio.run(run_load(args, base_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report = {
+        "commit": git_commit(),
+        "config": {
+            "concurrency": args.concurrency,
+            "durationSeconds": args.duration,
+            "mix": parse_mix(args.mix),
+            "users": args.users,
+            "llmDelaySeconds": args.llm_delay if server is not None else None,
+            "server": "local stand-ins" if server is not None else base_url,
+        },
+        **results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Offline evaluation of the retrieval modes (keyword, vector, hybrid) on a
+fixed query set.
+
+The catalog is frontend_ready_tools.json, embedded with the chosen
+embedding backend (the torch model by default, like enrich_database.py).
+Each query is judged against either a set of tool ids (looking for a named
+tool, typos included) or a category (describing a need). Run from the
+backend folder:
+
+    python benchmarks/retrieval_eval.py
+    python benchmarks/retrieval_eval.py --embedding-backend onnx --k 5 10
+
+recall@k is the share of the relevant tools found in the top k, out of at
+most k (so a query whose category has 80 tools is perfect with 5 of them in
+its top 5). Also reports MRR and per-mode latency, including the query
+embedding.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from catalog import EMBEDDING_FIELD, CatalogSnapshot  # noqa: E402
+from embedding_backends import load_embedding_backend, tool_embedding_text  # noqa: E402
+from executors import create_executor  # noqa: E402
+from fuzzy import FuzzyIndex  # noqa: E402
+from hybrid import RETRIEVAL_MODES, HybridRetriever  # noqa: E402
+from retrieval import ExactVectorRetriever  # noqa: E402
+from search_index import KeywordIndex  # noqa: E402
+
+# (query, {"ids": [...]} or {"category": ...})
+QUERIES = [
+    ("midjourney", {"ids": ["midjourney"]}),
+    ("midjorney alternatives", {"ids": ["midjourney"]}),
+    ("stabel diffusion", {"ids": ["stable-diffusion"]}),
+    ("elevenlabs voice cloning", {"ids": ["elevenlabs"]}),
+    ("github copilot", {"ids": ["github-copilot"]}),
+    ("notion ai", {"ids": ["notion-ai"]}),
+    ("grammarly", {"ids": ["grammarly"]}),
+    ("otter meeting notes", {"ids": ["otter-ai"]}),
+    ("descript podcast editing", {"ids": ["descript"]}),
+    ("synthesia", {"ids": ["synthesia"]}),
+    ("perplexity search", {"ids": ["perplexity"]}),
+    ("suno songs", {"ids": ["suno"]}),
+    ("turn my blog posts into natural sounding audio", {"category": "text to speech"}),
+    ("design a logo for my bakery", {"category": "logo generator"}),
+    ("write sql queries from plain english", {"category": "sql"}),
+    ("build a website without writing code", {"category": "website builders"}),
+    ("a talking presenter for training videos", {"category": "avatars"}),
+    ("translate documents into spanish", {"category": "translator"}),
+    ("summarize long pdf reports", {"category": "summarizer"}),
+    ("transcribe recorded interviews", {"category": "transcriber"}),
+    ("check whether an essay was written by chatgpt", {"category": "ai detection"}),
+    ("compose background music for youtube videos", {"category": "music"}),
+    ("plan a two week trip to japan", {"category": "travel"}),
+    ("upscale old low resolution videos", {"category": "video enhancer"}),
+    ("answer customer questions on my shop automatically", {"category": "customer support"}),
+    ("help with excel formulas", {"category": "spreadsheets"}),
+    ("make slides for my startup pitch", {"category": "presentations"}),
+    ("rewrite this paragraph in other words", {"category": "paraphrasing"}),
+    ("which stocks should i buy", {"category": "stock trading"}),
+    ("personal workout and diet plan", {"category": "fitness"}),
+    ("generate 3d models from a text prompt", {"category": "3d"}),
+    ("write cold outreach emails", {"category": "email assistant"}),
+    ("product descriptions for my online store", {"category": "e-commerce"}),
+    ("keyword research to rank higher on google", {"category": "seo"}),
+    ("review a rental contract", {"category": "legal"}),
+    ("screen resumes of job applicants", {"category": "human resources"}),
+]
+
+
+def load_snapshot(backend):
+    with open(os.path.join(BACKEND_DIR, "frontend_ready_tools.json"), "r", encoding="utf-8") as f:
+        tools = json.load(f)
+    print(f"Embedding {len(tools)} tools with the {backend.name} backend...", file=sys.stderr)
+    vectors = backend.encode([tool_embedding_text(tool) for tool in tools])
+    for tool, vector in zip(tools, vectors):
+        tool[EMBEDDING_FIELD] = np.asarray(vector, dtype=np.float32).tolist()
+    return CatalogSnapshot(tools, version="eval", loaded_at=time.time())
+
+
+def relevant_ids(snapshot, judgement):
+    if "ids" in judgement:
+        return set(judgement["ids"])
+    return {tool_id for tool_id in (tool["id"] for tool in snapshot.documents)
+            if judgement["category"] in {c.lower() for c in snapshot.by_id[tool_id].get("categories") or []}}
+
+
+def percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 3)
+
+
+async def evaluate(retriever, backend, executor, snapshot, ks, rounds):
+    async def embed(text):
+        return backend.encode([text])[0]
+
+    depth = max(ks)
+    report = {}
+    for mode in RETRIEVAL_MODES:
+        recalls = {k: [] for k in ks}
+        reciprocal_ranks, latencies, stages = [], [], {}
+        for query, judgement in QUERIES:
+            relevant = relevant_ids(snapshot, judgement)
+            for _ in range(rounds):
+                ranking, _, timings = await retriever.retrieve(query, limit=depth, mode=mode, embed=embed, executor=executor)
+                latencies.append(timings["total"])
+                for stage, seconds in timings.items():
+                    stages.setdefault(stage, []).append(seconds)
+            found = [tool_id for tool_id, _ in ranking]
+            for k in ks:
+                recalls[k].append(len(relevant & set(found[:k])) / min(k, len(relevant)))
+            first = next((rank for rank, tool_id in enumerate(found, 1) if tool_id in relevant), None)
+            reciprocal_ranks.append(1 / first if first else 0.0)
+        report[mode] = {
+            **{f"recall@{k}": round(float(np.mean(recalls[k])), 4) for k in ks},
+            f"mrr@{depth}": round(float(np.mean(reciprocal_ranks)), 4),
+            "p50Ms": percentile_ms(latencies, 50),
+            "p95Ms": percentile_ms(latencies, 95),
+            "stageMeanMs": {stage: round(float(np.mean(values)) * 1000, 3) for stage, values in stages.items()},
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embedding-backend", default=os.getenv("EMBEDDING_BACKEND", "torch"))
+    parser.add_argument("--model-dir", default=os.getenv("EMBEDDING_MODEL_DIR", os.path.join(BACKEND_DIR, "onnx_model")))
+    parser.add_argument("--k", type=int, nargs="+", default=[5, 10])
+    parser.add_argument("--rounds", type=int, default=3, help="timed runs per query and mode")
+    args = parser.parse_args()
+
+    # Progress goes to stderr: stdout is only the JSON report
+    with contextlib.redirect_stdout(sys.stderr):
+        backend = load_embedding_backend(args.embedding_backend, args.model_dir)
+        snapshot = load_snapshot(backend)
+        keyword_index, fuzzy_index, vector_retriever = KeywordIndex(), FuzzyIndex(), ExactVectorRetriever()
+        for index in (keyword_index, fuzzy_index, vector_retriever):
+            index.update(snapshot)
+    retriever = HybridRetriever(keyword_index, vector_retriever, fuzzy_index)
+    executor = create_executor(1, "eval")
+
+    results = asyncio.run(evaluate(retriever, backend, executor, snapshot, sorted(args.k), args.rounds))
+    print(json.dumps({
+        "tools": len(snapshot),
+        "queries": len(QUERIES),
+        "embeddingBackend": args.embedding_backend,
+        "modes": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
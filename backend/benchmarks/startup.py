@@ -0,0 +1,122 @@
+"""
+Import-time and startup benchmark for the API.
+
+Measures, each in a fresh process:
+  * how long `import app` takes (median of --runs) and which modules are
+    the slowest to import (python -X importtime);
+  * how long a uvicorn worker takes to answer /healthz (liveness) and
+    /readyz (database, catalog and models warm).
+
+Run from the backend folder with the same environment as the server:
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --max-import-seconds 2   # exit 1 on regression
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+
+
+def measure_import(runs):
+    seconds = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_SNIPPET],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+        )
+        seconds.append(float(result.stdout.strip().splitlines()[-1]))
+    return seconds
+
+
+def slowest_imports(top):
+    """Modules imported directly by app, by cumulative import time (-X importtime)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nesting is shown by indenting the name two spaces per level
+        if len(name) - len(name.lstrip()) == 3:
+            packages[name.strip()] = int(cumulative) / 1e6
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "seconds": round(seconds, 3)} for name, seconds in ranked]
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=2) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"null")
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        return None, None
+
+
+def measure_server(port, timeout):
+    base = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    result = {"healthzSeconds": None, "readyzSeconds": None, "readyz": None}
+    try:
+        while time.perf_counter() - start < timeout:
+            if result["healthzSeconds"] is None and get(f"{base}/healthz")[0] == 200:
+                result["healthzSeconds"] = round(time.perf_counter() - start, 3)
+            if result["healthzSeconds"] is not None:
+                status_code, body = get(f"{base}/readyz")
+                result["readyz"] = body
+                if status_code == 200:
+                    result["readyzSeconds"] = round(time.perf_counter() - start, 3)
+                    break
+            time.sleep(0.05)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh-process imports to time")
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for /readyz")
+    parser.add_argument("--skip-server", action="store_true", help="only measure the import")
+    parser.add_argument("--max-import-seconds", type=float, help="exit with status 1 above this median")
+    args = parser.parse_args()
+
+    import_seconds = measure_import(args.runs)
+    report = {
+        "importSeconds": {
+            "median": round(statistics.median(import_seconds), 3),
+            "runs": [round(seconds, 3) for seconds in import_seconds],
+        },
+        "slowestImports": slowest_imports(args.top),
+    }
+    if not args.skip_server:
+        report["server"] = measure_server(args.port, args.timeout)
+    print(json.dumps(report, indent=2))
+
+    if args.max_import_seconds is not None and report["importSeconds"]["median"] > args.max_import_seconds:
+        print(f"❌ Import took {report['importSeconds']['median']}s, budget is {args.max_import_seconds}s.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
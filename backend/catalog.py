@@ -0,0 +1,286 @@
+import base64
+import binascii
+import bisect
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timezone
+
+# Fields returned by /api/tools, with the defaults used when a document lacks them.
+LIST_FIELDS = {
+    "id": "",
+    "name": "",
+    "description": "",
+    "categories": [],
+    "useCases": [],
+    "trendScore": 0,
+    "website": "",
+    "github": "",
+    "docs": "",
+    "createdAt": "",
+}
+
+EMBEDDING_FIELD = "description_embedding"
+TOP_N = 10
+CATALOG_META_ID = "tools"
+
+
+def list_projection(tool):
+    """Builds the sanitized dict served by /api/tools for one tool."""
+    return {field: tool.get(field, default) for field, default in LIST_FIELDS.items()}
+
+
+def pricing_bucket(pricing_model):
+    """
+    Normalizes a free-form pricingModel ("Freemium, $19.99/mo") to the bucket
+    used for filtering ("freemium").
+    """
+    if not pricing_model:
+        return "unknown"
+    return pricing_model.split(",")[0].strip().lower() or "unknown"
+
+
+def encode_cursor(tool_id):
+    return base64.urlsafe_b64encode(tool_id.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns the tool id a cursor points after. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def descending(field):
+    # Mirrors MongoDB's descending sort, where missing/null values come last.
+    def key(tool):
+        value = tool.get(field)
+        return (value is not None, value if value is not None else 0)
+    return key
+
+
+def mark_catalog_updated(db):
+    """
+    Bumps the catalog marker document so running API workers reload their
+    snapshot. Call this after any script that writes to the tools collection.
+    """
+    db.catalog_meta.update_one(
+        {"_id": CATALOG_META_ID},
+        {"$set": {"updatedAt": datetime.now(timezone.utc)}},
+        upsert=True,
+    )
+
+
+def ensure_tool_indexes(tools_collection):
+    """
+    Declares the unique index on the tool id that the upserts and the
+    {"id": ...} / {"id": {"$in": [...]}} lookups rely on. Idempotent.
+    """
+    tools_collection.create_index("id", unique=True, name="id_unique")
+
+
+class CatalogSnapshot:
+    """
+    An immutable, pre-projected view of the tools collection.
+
+    Every structure is built once when the snapshot is created, so request
+    handlers only ever read from it.
+    """
+
+    def __init__(self, documents, version=None, loaded_at=None):
+        self.version = version
+        self.loaded_at = loaded_at
+        self.embeddings = {}
+        self.documents = []
+        for doc in documents:
+            doc = dict(doc)
+            doc.pop("_id", None)
+            embedding = doc.pop(EMBEDDING_FIELD, None)
+            if embedding is not None and doc.get("id"):
+                self.embeddings[doc["id"]] = embedding
+            self.documents.append(doc)
+
+        self.by_id = {doc["id"]: doc for doc in self.documents if doc.get("id")}
+        self.tools = [list_projection(doc) for doc in self.documents]
+        # sorted() is stable, so ties keep the collection's natural order like Mongo does.
+        self.popular = sorted(self.documents, key=descending("popularity"), reverse=True)[:TOP_N]
+        self.latest = sorted(self.documents, key=descending("trendScore"), reverse=True)[:TOP_N]
+
+        # Secondary indexes for server-side filtering and cursor paging.
+        # Positions refer to self.documents / self.tools and are kept ascending.
+        self.fields = {field for doc in self.documents for field in doc} | set(LIST_FIELDS)
+        self.position_by_id = {doc["id"]: pos for pos, doc in enumerate(self.documents) if doc.get("id")}
+        self.by_category = {}
+        self.by_pricing = {}
+        for pos, doc in enumerate(self.documents):
+            for category in doc.get("categories") or []:
+                self.by_category.setdefault(category.lower(), []).append(pos)
+            self.by_pricing.setdefault(pricing_bucket(doc.get("pricingModel")), []).append(pos)
+        self._trend_sorted = sorted(
+            (doc.get("trendScore") or 0, pos) for pos, doc in enumerate(self.documents)
+        )
+        self._trend_keys = [score for score, _ in self._trend_sorted]
+
+    def filter_positions(self, category=None, pricing=None, min_trend_score=None):
+        """Returns the ascending positions of tools matching every given filter."""
+        candidates = None
+        if category is not None:
+            candidates = set(self.by_category.get(category.lower(), []))
+        if pricing is not None:
+            matches = set(self.by_pricing.get(pricing.strip().lower(), []))
+            candidates = matches if candidates is None else candidates & matches
+        if min_trend_score is not None:
+            start = bisect.bisect_left(self._trend_keys, min_trend_score)
+            matches = {pos for _, pos in self._trend_sorted[start:]}
+            candidates = matches if candidates is None else candidates & matches
+        if candidates is None:
+            return list(range(len(self.documents)))
+        return sorted(candidates)
+
+    def page(self, positions, limit=None, cursor=None):
+        """
+        Slices filtered positions after the cursor's tool. Returns the page
+        and the cursor for the next one (None on the last page).
+        """
+        start = 0
+        if cursor:
+            tool_id = decode_cursor(cursor)
+            if tool_id not in self.position_by_id:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            start = bisect.bisect_right(positions, self.position_by_id[tool_id])
+        if limit is None:
+            return positions[start:], None
+        page = positions[start:start + limit]
+        has_more = start + limit < len(positions)
+        next_cursor = encode_cursor(self.documents[page[-1]]["id"]) if has_more and page else None
+        return page, next_cursor
+
+    def project(self, position, fields=None):
+        """Returns the tool at position restricted to fields (the list shape by default)."""
+        if fields is None:
+            return self.tools[position]
+        doc = self.documents[position]
+        return {field: doc.get(field, LIST_FIELDS.get(field)) for field in fields}
+
+    @property
+    def is_loaded(self):
+        return self.loaded_at is not None
+
+    def __len__(self):
+        return len(self.documents)
+
+
+def catalog_version(documents):
+    """
+    Content hash of the tool documents. Embeddings are left out, so the
+    version is the same whether or not they were loaded (see
+    Catalog(with_embeddings=...)); enrichment also writes similarTools
+    whenever it adds embeddings, which does change it.
+    """
+    digest = hashlib.sha1()
+    for doc in documents:
+        if EMBEDDING_FIELD in doc:
+            doc = {field: value for field, value in doc.items() if field != EMBEDDING_FIELD}
+        digest.update(json.dumps(doc, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class Catalog:
+    """
+    Holds the current CatalogSnapshot and keeps it fresh.
+
+    A background thread reloads the snapshot when the catalog marker document
+    changes (see mark_catalog_updated) or when the TTL expires. Listeners
+    registered with subscribe() are called with the new snapshot whenever its
+    content version changes.
+
+    With with_embeddings=False the embeddings are not read at all; the ann
+    and atlas retrievers keep their own copy.
+    """
+
+    def __init__(self, tools_collection, meta_collection=None, ttl_seconds=300, poll_seconds=10,
+                 with_embeddings=True):
+        self.tools_collection = tools_collection
+        self.meta_collection = meta_collection
+        self.projection = {"_id": 0} if with_embeddings else {"_id": 0, EMBEDDING_FIELD: 0}
+        self.ttl_seconds = ttl_seconds
+        self.poll_seconds = poll_seconds
+        self.snapshot = CatalogSnapshot([])
+        self._listeners = []
+        self._load_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._marker = None
+        self._last_refresh = None
+
+    def subscribe(self, callback):
+        """
+        Registers callback(snapshot), called after each version change. The
+        indexes kept in sync this way (keyword, facets, suggest, fuzzy,
+        insights, vector retrievers) build the new state aside and swap it
+        in as one tuple, so concurrent readers never see a half-built index.
+        """
+        self._listeners.append(callback)
+        if self.snapshot.is_loaded:
+            callback(self.snapshot)
+
+    def _read_marker(self):
+        if self.meta_collection is None:
+            return None
+        meta = self.meta_collection.find_one({"_id": CATALOG_META_ID})
+        return meta.get("updatedAt") if meta else None
+
+    def load(self):
+        """Reads the whole collection and swaps in a new snapshot."""
+        with self._load_lock:
+            marker = self._read_marker()
+            documents = list(self.tools_collection.find({}, self.projection))
+            version = catalog_version(documents)
+            self._marker = marker
+            self._last_refresh = time.time()
+            if version == self.snapshot.version:
+                # Nothing changed since the last load, keep the current snapshot.
+                return self.snapshot
+
+            snapshot = CatalogSnapshot(documents, version=version, loaded_at=self._last_refresh)
+            self.snapshot = snapshot
+            print(f"✅ Catalog snapshot loaded: {len(snapshot)} tools (version {version}).")
+
+        for callback in self._listeners:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"❌ Catalog listener {getattr(callback, '__name__', callback)} failed: {e}")
+        return snapshot
+
+    def _needs_refresh(self):
+        if self._last_refresh is None:
+            return True
+        if time.time() - self._last_refresh >= self.ttl_seconds:
+            return True
+        return self._read_marker() != self._marker
+
+    def _run(self):
+        while not self._stop_event.wait(self.poll_seconds):
+            try:
+                if self._needs_refresh():
+                    self.load()
+            except Exception as e:
+                print(f"❌ Catalog refresh failed: {e}")
+
+    def start(self):
+        """Starts the background refresher thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="catalog-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds)
+            self._thread = None
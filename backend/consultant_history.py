@@ -0,0 +1,84 @@
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING
+
+HISTORY_SORT = [("timestamp", DESCENDING), ("_id", DESCENDING)]
+
+
+def _as_utc(timestamp):
+    # pymongo returns naive datetimes that are in UTC
+    return timestamp if timestamp.tzinfo is not None else timestamp.replace(tzinfo=timezone.utc)
+
+
+def encode_history_cursor(entry):
+    """Opaque cursor pointing after entry (timestamp in ms, then _id)."""
+    position = {"t": int(_as_utc(entry["timestamp"]).timestamp() * 1000), "id": str(entry["_id"])}
+    raw = json.dumps(position, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor):
+    """Returns (timestamp, ObjectId) a cursor points after. Raises ValueError if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        timestamp = datetime.fromtimestamp(position["t"] / 1000, tz=timezone.utc)
+        return timestamp, ObjectId(position["id"])
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class ConsultantHistory:
+    """
+    Consultant conversations, one document per exchange in their own
+    collection: {email, prompt, recommendation, timestamp}.
+
+    Reads go through the (email, timestamp, _id) index newest first and are
+    paged with a keyset cursor, so the cost of a page does not grow with
+    the length of a user's history.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def ensure_indexes(self):
+        self.collection.create_index(
+            [("email", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="email_timestamp",
+        )
+
+    def add(self, email, prompt, recommendation, timestamp=None):
+        self.collection.insert_one({
+            "email": email,
+            "prompt": prompt,
+            "recommendation": recommendation,
+            "timestamp": timestamp or datetime.now(timezone.utc),
+        })
+
+    def page(self, email, limit, cursor=None):
+        """
+        Returns (entries, next_cursor) for one user, newest first. Each entry
+        has prompt, recommendation and timestamp; next_cursor is None on the
+        last page.
+        """
+        query = {"email": email}
+        if cursor is not None:
+            timestamp, last_id = decode_history_cursor(cursor)
+            query["$or"] = [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "_id": {"$lt": last_id}},
+            ]
+        documents = list(
+            self.collection.find(query, {"email": 0}).sort(HISTORY_SORT).limit(limit + 1)
+        )
+        next_cursor = encode_history_cursor(documents[limit - 1]) if len(documents) > limit else None
+        entries = [
+            {key: value for key, value in document.items() if key != "_id"}
+            for document in documents[:limit]
+        ]
+        return entries, next_cursor
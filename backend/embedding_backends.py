@@ -0,0 +1,153 @@
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+# all-MiniLM-L6-v2 truncates inputs to 256 word pieces
+MAX_SEQ_LENGTH = 256
+ONNX_MODEL_FILES = {"onnx": "model.onnx", "onnx-int8": "model-int8.onnx"}
+
+
+def tool_embedding_text(tool):
+    """The text embedded for each tool (name, description and categories)."""
+    return f"Name: {tool.get('name', '')}. Description: {tool.get('description', '')}. Categories: {', '.join(tool.get('categories', []))}"
+
+
+class SentenceTransformerBackend:
+    """The reference PyTorch model, as loaded before backends existed."""
+
+    name = "torch"
+
+    def __init__(self, model_name=MODEL_NAME):
+        # Imported here so the ONNX backends never pay for importing torch.
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+
+    def encode(self, texts, batch_size=32):
+        return self.model.encode(texts, batch_size=batch_size)
+
+
+class OnnxBackend:
+    """
+    Runs an ONNX export of all-MiniLM-L6-v2 (see export_onnx_model.py) with
+    onnxruntime on the CPU, reproducing the sentence-transformers pipeline:
+    tokenize, transformer, mean pooling over the attention mask, L2 normalize.
+    """
+
+    def __init__(self, model_dir, model_file="model.onnx", threads=None):
+        import onnxruntime
+        from tokenizers import Tokenizer
+
+        self.name = "onnx-int8" if "int8" in model_file else "onnx"
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=MAX_SEQ_LENGTH)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def _encode_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        inputs = {name: value for name, value in inputs.items() if name in self.input_names}
+        token_embeddings = self.session.run(None, inputs)[0]
+
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.clip(norms, 1e-12, None)).astype(np.float32)
+
+    def encode(self, texts, batch_size=32):
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        vectors = np.vstack([
+            self._encode_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ])
+        return vectors[0] if single else vectors
+
+
+class HashingBackend:
+    """
+    Deterministic feature-hashing embeddings for offline runs and load tests
+    (EMBEDDING_BACKEND=hashing): no model, no download, microseconds per
+    text. Texts that share words land close together, which is enough to
+    exercise retrieval, but it is no substitute for the real model.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"[a-z0-9]+", text.lower()):
+            bucket = int.from_bytes(hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[bucket % self.dim] += 1.0 if bucket >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def encode(self, texts, batch_size=32):
+        if isinstance(texts, str):
+            return self._embed(texts)
+        return np.array([self._embed(text) for text in texts], dtype=np.float32).reshape(-1, self.dim)
+
+
+def load_embedding_backend(name, model_dir=None):
+    """
+    Loads the embedding backend selected by EMBEDDING_BACKEND:
+    "torch" (default), "onnx" or "onnx-int8". The ONNX backends read
+    model_dir, as written by export_onnx_model.py. "hashing" is a
+    model-free stand-in for offline runs and load tests.
+    """
+    if name == "torch":
+        return SentenceTransformerBackend()
+    if name == "hashing":
+        return HashingBackend()
+    if name in ONNX_MODEL_FILES:
+        return OnnxBackend(model_dir, ONNX_MODEL_FILES[name])
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+
+class LazyEmbeddingBackend:
+    """
+    Defers load_embedding_backend() until load() or the first encode(), so
+    importing the API does not import torch or onnxruntime. The startup
+    warm-up calls load(); concurrent callers wait for the same load.
+    """
+
+    def __init__(self, name, model_dir=None):
+        self.name = name
+        self.model_dir = model_dir
+        self._backend = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self):
+        return self._backend is not None
+
+    def load(self):
+        if self._backend is None:
+            with self._lock:
+                if self._backend is None:
+                    self._backend = load_embedding_backend(self.name, self.model_dir)
+        return self._backend
+
+    def encode(self, texts, batch_size=32):
+        return self.load().encode(texts, batch_size=batch_size)
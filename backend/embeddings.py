@@ -0,0 +1,146 @@
+import asyncio
+import time
+import weakref
+
+import numpy as np
+
+from executors import run_in
+from ttl_cache import TTLCache
+
+
+def normalize_prompt(prompt):
+    """Case- and whitespace-insensitive cache key for a prompt."""
+    return " ".join(prompt.lower().split())
+
+
+class BatchingEncoder:
+    """
+    Collects concurrent encode requests and runs them through the model as
+    one batch.
+
+    The first request of a batch waits at most max_wait_ms for company; a
+    batch is flushed early once max_batch_size requests are queued. The
+    batched model call runs on the given executor and each caller gets its
+    own row back. The queue and its worker task belong to the running event
+    loop, so the encoder can be used from several loops (one asyncio.run()
+    after another, or one app lifespan after another).
+    """
+
+    def __init__(self, model, executor, max_batch_size=32, max_wait_ms=5):
+        self.model = model
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self.batches = 0
+        self.items = 0
+        # event loop -> its _Queue; dropped with the loop
+        self._queues = weakref.WeakKeyDictionary()
+
+    async def encode(self, text):
+        loop = asyncio.get_running_loop()
+        queue = self._queues.get(loop)
+        if queue is None:
+            queue = self._queues[loop] = _Queue()
+        future = loop.create_future()
+        queue.pending.append((text, future, time.monotonic()))
+        if len(queue.pending) >= self.max_batch_size:
+            queue.full.set()
+        if queue.worker is None or queue.worker.done():
+            queue.worker = loop.create_task(self._run(queue))
+            queue.worker.add_done_callback(queue.worker_done)
+        return await future
+
+    async def _run(self, queue):
+        batch = []
+        error = None
+        try:
+            while queue.pending:
+                waited = time.monotonic() - queue.pending[0][2]
+                if waited < self.max_wait_seconds and len(queue.pending) < self.max_batch_size:
+                    try:
+                        await asyncio.wait_for(queue.full.wait(), timeout=self.max_wait_seconds - waited)
+                    except asyncio.TimeoutError:
+                        pass
+                queue.full.clear()
+
+                batch = queue.pending[:self.max_batch_size]
+                queue.pending = queue.pending[self.max_batch_size:]
+                try:
+                    vectors = await run_in(self.executor, self.model.encode, [text for text, _, _ in batch])
+                    if len(vectors) != len(batch):
+                        raise RuntimeError(f"Expected {len(batch)} embeddings, the model returned {len(vectors)}")
+                except Exception as e:
+                    _fail(batch, e)
+                    continue
+
+                self.batches += 1
+                self.items += len(batch)
+                for (_, future, _), vector in zip(batch, vectors):
+                    if not future.done():  # the caller may have been cancelled
+                        future.set_result(np.asarray(vector, dtype=np.float32))
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            # Whatever stopped the worker, no caller may be left waiting
+            _fail(batch, error)
+            _fail(queue.pending, error)
+            queue.pending = []
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "averageBatchSize": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+class _Queue:
+    """The pending requests and worker task of one event loop."""
+
+    def __init__(self):
+        self.pending = []  # (text, future, enqueued_at)
+        self.full = asyncio.Event()
+        self.worker = None
+
+    def worker_done(self, task):
+        # A worker cancelled before its first step never reaches _run's
+        # finally; fail what it left unless a newer worker took over.
+        if task is self.worker and task.cancelled():
+            _fail(self.pending, None)
+            self.pending = []
+
+
+def _fail(requests, error):
+    """Fails the futures still waiting, with error or by cancelling them."""
+    for _, future, _ in requests:
+        if not future.done():
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+
+class CachedEncoder:
+    """
+    Wraps a BatchingEncoder with a bounded LRU/TTL cache keyed on the
+    normalized prompt, so repeated prompts skip the model forward pass.
+    """
+
+    def __init__(self, batcher, max_size=1024, ttl_seconds=3600):
+        self.batcher = batcher
+        self.cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+
+    def _remember(self, key, embedding):
+        embedding = np.asarray(embedding, dtype=np.float32)
+        # Shared between requests, so make accidental in-place edits fail loudly.
+        embedding.setflags(write=False)
+        self.cache.set(key, embedding)
+        return embedding
+
+    async def aencode(self, prompt):
+        key = normalize_prompt(prompt)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            embedding = self._remember(key, await self.batcher.encode(prompt))
+        return embedding
@@ -1,7 +1,44 @@
 from pymongo import MongoClient
 from dotenv import load_dotenv
 import os
-from sentence_transformers import SentenceTransformer
+import numpy as np
+from catalog import mark_catalog_updated
+from insights import refresh_insights
+from ann_index import IVFIndex
+from similar_tools import build_similar_tools
+from embedding_backends import load_embedding_backend, tool_embedding_text
+
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_MODEL_DIR = os.getenv("EMBEDDING_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_model"))
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ann_index"))
+
+
+def build_ann_index(tools_collection):
+    """
+    Builds an IVF approximate nearest-neighbour index over every stored
+    embedding and saves it to ANN_INDEX_DIR with a version stamp.
+    """
+    print("\nBuilding ANN index over tool embeddings...")
+    query = {"description_embedding": {"$exists": True}, "id": {"$exists": True}}
+    total = tools_collection.count_documents(query)
+    # Streamed into one float32 matrix instead of a list of Python float lists
+    ids, vectors = [], None
+    for doc in tools_collection.find(query, {"_id": 0, "id": 1, "description_embedding": 1}):
+        if vectors is None:
+            vectors = np.empty((total, len(doc["description_embedding"])), dtype=np.float32)
+        if len(ids) == total:
+            break  # embedded since the count; the API's incremental sync inserts these
+        vectors[len(ids)] = doc["description_embedding"]
+        ids.append(doc["id"])
+    if not ids:
+        print("No embeddings found, skipping the ANN index.")
+        return None
+    index = IVFIndex.build(ids, vectors[:len(ids)])
+    manifest = index.save(ANN_INDEX_DIR)
+    print(f"✅ ANN index saved to {ANN_INDEX_DIR}: {manifest['count']} vectors, "
+          f"{manifest['nLists']} lists (version {manifest['version']}).")
+    return manifest
+
 
 def enrich_data_with_embeddings():
     """
@@ -30,8 +67,8 @@ def enrich_data_with_embeddings():
     # --- 2. Load the Embedding Model ---
     # This model is small, fast, and effective for semantic search.
     # The first time you run this, it will download the model (a few hundred MB).
-    print("Loading sentence-transformer model (this may take a moment)...")
-    model = SentenceTransformer('all-MiniLM-L6-v2')
+    print(f"Loading the {EMBEDDING_BACKEND} embedding model (this may take a moment)...")
+    model = load_embedding_backend(EMBEDDING_BACKEND, EMBEDDING_MODEL_DIR)
     print("✅ Model loaded successfully.")
 
     # --- 3. Iterate, Create Embeddings, and Update ---
@@ -40,30 +77,39 @@ def enrich_data_with_embeddings():
     
     if not tools_to_update:
         print("All documents are already enriched. Nothing to do.")
-        return
+    else:
+        print(f"Found {len(tools_to_update)} tools to enrich.")
 
-    print(f"Found {len(tools_to_update)} tools to enrich.")
-    
-    for tool in tools_to_update:
-        try:
-            # Create a combined text string for better semantic meaning
-            combined_text = f"Name: {tool.get('name', '')}. Description: {tool.get('description', '')}. Categories: {', '.join(tool.get('categories', []))}"
+        for tool in tools_to_update:
+            try:
+                # Create a combined text string for better semantic meaning
+                combined_text = tool_embedding_text(tool)
             
-            # Generate the embedding
-            embedding = model.encode(combined_text).tolist()
+                # Generate the embedding
+                embedding = model.encode(combined_text).tolist()
             
-            # Update the document in MongoDB with the new embedding field
-            tools_collection.update_one(
-                {'_id': tool['_id']},
-                {'$set': {'description_embedding': embedding}}
-            )
-            print(f"  -> Enriched: {tool.get('name')}")
-
-        except Exception as e:
-            print(f"Could not process tool {tool.get('name')}. Error: {e}")
-    
+                # Update the document in MongoDB with the new embedding field
+                tools_collection.update_one(
+                    {'_id': tool['_id']},
+                    {'$set': {'description_embedding': embedding}}
+                )
+                print(f"  -> Enriched: {tool.get('name')}")
+
+            except Exception as e:
+                print(f"Could not process tool {tool.get('name')}. Error: {e}")
+
+    # --- 4. Rebuild the ANN index the API memory-maps at startup ---
+    build_ann_index(tools_collection)
+
+    # --- 5. Precompute the similar-tools graph served by /api/tools/{id}/similar ---
+    build_similar_tools(tools_collection)
+
+    # The new similarTools are part of the catalog version the insights are tagged with
+    refresh_insights(db)
+    mark_catalog_updated(db)
     print("\n✅ Database enrichment complete!")
-    print("Your next step is to create a Vector Search Index in MongoDB Atlas.")
+    print("The API's local vector retriever picks the embeddings up on its next catalog refresh.")
+    print("Only if you run it with VECTOR_RETRIEVER=atlas: create a Vector Search Index in MongoDB Atlas.")
 
 
 if __name__ == "__main__":
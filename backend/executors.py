@@ -0,0 +1,14 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+def create_executor(max_workers, name):
+    """A bounded thread pool; its size caps how many calls of one kind run at once."""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+
+
+async def run_in(executor, func, *args, **kwargs):
+    """Runs a blocking call on executor and awaits its result from the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
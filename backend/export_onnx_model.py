@@ -0,0 +1,74 @@
+import os
+
+from dotenv import load_dotenv
+
+from embedding_backends import MAX_SEQ_LENGTH, MODEL_NAME, ONNX_MODEL_FILES
+
+
+def export_onnx_model():
+    """
+    Exports all-MiniLM-L6-v2 to ONNX and writes a dynamically quantized int8
+    copy next to it, for EMBEDDING_BACKEND=onnx / onnx-int8.
+    Needs torch, sentence-transformers and onnxruntime; run it once per model.
+    """
+    load_dotenv()
+    model_dir = os.getenv("EMBEDDING_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "onnx_model"))
+    os.makedirs(model_dir, exist_ok=True)
+
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from sentence_transformers import SentenceTransformer
+
+    # --- 1. Load the reference model ---
+    print(f"Loading {MODEL_NAME}...")
+    model = SentenceTransformer(MODEL_NAME)
+    auto_model = model[0].auto_model
+
+    class LastHiddenState(torch.nn.Module):
+        # A fixed positional signature keeps tracing independent of the
+        # keyword-heavy forward() of newer transformers releases.
+        def __init__(self):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.auto_model(
+                input_ids=input_ids, attention_mask=attention_mask,
+                token_type_ids=token_type_ids, return_dict=True,
+            ).last_hidden_state
+
+    transformer = LastHiddenState().eval()
+    tokenizer = model.tokenizer
+
+    # --- 2. Export the transformer (pooling + normalization happen in OnnxBackend) ---
+    fp32_path = os.path.join(model_dir, ONNX_MODEL_FILES["onnx"])
+    sample = tokenizer(["an example sentence"], padding=True, truncation=True,
+                       max_length=MAX_SEQ_LENGTH, return_tensors="pt")
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    print(f"Exporting ONNX model to {fp32_path}...")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            tuple(sample[name] for name in input_names),
+            fp32_path,
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=14,
+            dynamo=False,  # the TorchScript exporter; needs no onnxscript
+        )
+    tokenizer.save_pretrained(model_dir)  # writes tokenizer.json
+
+    # --- 3. Quantize the weights to int8 ---
+    int8_path = os.path.join(model_dir, ONNX_MODEL_FILES["onnx-int8"])
+    print(f"Quantizing to {int8_path}...")
+    quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+
+    print("\n✅ ONNX export complete!")
+    print("Check agreement with the reference model with: python benchmarks/embedding_backend_bench.py")
+
+
+if __name__ == "__main__":
+    export_onnx_model()
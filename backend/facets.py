@@ -0,0 +1,100 @@
+from catalog import pricing_bucket
+
+
+def bitmap(positions, size):
+    """An int with bit p set for each position p (built in O(size), not O(n^2))."""
+    raw = bytearray((size + 7) // 8)
+    for position in positions:
+        raw[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(raw, "little")
+
+
+def iter_positions(bits):
+    """Yields the set bit positions of bits in ascending order."""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+
+class FacetIndex:
+    """
+    Category and pricing facets over the catalog, one bitmap (a Python int,
+    bit = snapshot position) per value.
+
+    A query ANDs the selected bitmaps and counts every facet value with
+    int.bit_count(). Counts are disjunctive: each facet is counted with the
+    other facet's selection applied but not its own, so the filter bar can
+    show how many tools switching to another value would give.
+    """
+
+    def __init__(self):
+        # (snapshot, all_bits, {category key: bits}, {pricing bucket: bits}, {key: display label})
+        self._state = None
+
+    def update(self, snapshot):
+        size = len(snapshot.documents)
+        labels = {"category": {}, "pricing": {}}
+        for doc in snapshot.documents:
+            for category in doc.get("categories") or []:
+                labels["category"].setdefault(category.lower(), category)
+            pricing_model = doc.get("pricingModel")
+            if pricing_model:
+                labels["pricing"].setdefault(pricing_bucket(pricing_model), pricing_model.split(",")[0].strip())
+        categories = {key: bitmap(positions, size) for key, positions in snapshot.by_category.items()}
+        pricing = {key: bitmap(positions, size) for key, positions in snapshot.by_pricing.items()}
+        self._state = (snapshot, (1 << size) - 1, categories, pricing, labels)
+        print(f"✅ Facet index updated: {len(categories)} categories, {len(pricing)} pricing buckets.")
+
+    @property
+    def is_loaded(self):
+        return self._state is not None
+
+    def search(self, category=None, pricing=None, ranked_ids=None, limit=50, offset=0):
+        """
+        Returns {"total", "ids", "facets"} for tools in the category and
+        pricing bucket (both optional). ranked_ids restricts the result to
+        those tools, in that order (e.g. keyword matches); otherwise ids are
+        in catalog order. ids holds at most limit entries after offset.
+        """
+        snapshot, all_bits, categories, pricing_bits, labels = self._state
+        base = all_bits
+        if ranked_ids is not None:
+            positions = [snapshot.position_by_id[tool_id] for tool_id in ranked_ids if tool_id in snapshot.position_by_id]
+            base = bitmap(positions, len(snapshot.documents))
+
+        category_bits = all_bits if category is None else categories.get(category.lower(), 0)
+        pricing_bits_selected = all_bits if pricing is None else pricing_bits.get(pricing_bucket(pricing), 0)
+        matches = base & category_bits & pricing_bits_selected
+
+        if ranked_ids is not None:
+            ordered = (pos for pos in positions if matches >> pos & 1)
+        else:
+            ordered = iter_positions(matches)
+        ids = []
+        for index, pos in enumerate(ordered):
+            if index >= offset + limit:
+                break
+            if index >= offset:
+                ids.append(snapshot.documents[pos]["id"])
+
+        for_categories = base & pricing_bits_selected
+        for_pricing = base & category_bits
+        return {
+            "total": matches.bit_count(),
+            "ids": ids,
+            "facets": {
+                "category": _counts(for_categories, categories, labels["category"]),
+                "pricing": _counts(for_pricing, pricing_bits, labels["pricing"]),
+            },
+        }
+
+
+def _counts(selection, facet_bits, labels):
+    counts = [
+        {"value": labels.get(key, key), "count": (selection & bits).bit_count()}
+        for key, bits in facet_bits.items()
+    ]
+    counts = [entry for entry in counts if entry["count"]]
+    counts.sort(key=lambda entry: (-entry["count"], entry["value"].lower()))
+    return counts
@@ -0,0 +1,213 @@
+import heapq
+
+import numpy as np
+
+from suggest import normalize
+
+# Share of an entry's trigrams (of the query's, for prefixes) that must be
+# found on the other side for the entry to become a candidate.
+MIN_COVERAGE = 0.5
+# Candidates re-ranked with the edit distance, per query.
+CANDIDATES = 50
+# 1 - edit distance / length, on the best-matching window of the query.
+MIN_SIMILARITY = 0.7
+# Among close entries, those covering more of the query rank first
+# ("stabel diffusion" -> "Stable Diffusion" before "Riffusion").
+QUERY_COVERAGE_WEIGHT = 0.25
+# A category match ranks its tools just below an equally close name match.
+CATEGORY_WEIGHT = 0.9
+
+
+def trigrams(text, prefix=False):
+    """
+    Character trigrams of normalized text, each word padded like pg_trgm
+    ("  ab", " abc", ..., "yz "). With prefix=True the last word may be
+    incomplete, so its end-of-word trigram is left out.
+    """
+    grams = set()
+    words = text.split()
+    for position, word in enumerate(words):
+        padded = f"  {word}" if prefix and position == len(words) - 1 else f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Levenshtein distance (insertions, deletions and substitutions). With
+    max_distance only the diagonal band that can stay within it is
+    computed, and max_distance + 1 is returned once the distance must
+    exceed it.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    band = len(a) if max_distance is None else max_distance
+    if len(a) - len(b) > band:
+        return band + 1
+    over = band + 1
+    previous = [j if j <= band else over for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        lo, hi = max(1, i - band), min(len(b), i + band)
+        current = [over] * (len(b) + 1)
+        current[0] = i if i <= band else over
+        for j in range(lo, hi + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+        if min(current[lo - 1:hi + 1]) > band:
+            return over
+        previous = current
+    return min(previous[-1], over)
+
+
+def similarity(a, b, minimum=0.0):
+    """1 - edit distance / length; 0.0 when it would be below minimum."""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    max_distance = int(longest * (1 - minimum) + 1e-9)
+    distance = edit_distance(a, b, max_distance)
+    return 1 - distance / longest if distance <= max_distance else 0.0
+
+
+class FuzzyIndex:
+    """
+    Typo-tolerant lookup of tool names and categories ("midjorney",
+    "stabel diffusion") through a character-trigram inverted index.
+
+    A query counts, with one numpy bincount over the posting arrays of its
+    trigrams, how many trigrams it shares with every entry. The best
+    covered entries are then re-ranked by edit distance against the window
+    of query words that matches them best, so the entries can appear
+    anywhere in a chat message.
+    """
+
+    def __init__(self):
+        # (version, entries: [(normalized, text, type, tool ids)], {trigram: int32 array}, trigram counts)
+        self._state = None
+
+    def update(self, snapshot):
+        if self._state is not None and self._state[0] == snapshot.version:
+            return
+        ranked = sorted(
+            snapshot.documents,
+            key=lambda tool: (tool.get("popularity") or 0, tool.get("trendScore") or 0),
+            reverse=True,
+        )
+        entries = []
+        categories = {}
+        for tool in ranked:
+            if tool.get("id") and normalize(tool.get("name")):
+                entries.append((normalize(tool["name"]), tool["name"], "tool", [tool["id"]]))
+            for category in dict.fromkeys(tool.get("categories") or []):
+                key = normalize(category)
+                if not key:
+                    continue
+                if key not in categories:
+                    categories[key] = len(entries)
+                    entries.append((key, category, "category", []))
+                entries[categories[key]][3].append(tool["id"])
+
+        postings = {}
+        sizes = np.zeros(len(entries), dtype=np.float32)
+        for position, (key, _, _, _) in enumerate(entries):
+            grams = trigrams(key)
+            sizes[position] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        postings = {gram: np.asarray(positions, dtype=np.int32) for gram, positions in postings.items()}
+        self._state = (snapshot.version, entries, postings, sizes)
+        print(f"✅ Fuzzy index updated: {len(entries)} names and categories, {len(postings)} trigrams.")
+
+    def _candidates(self, query, prefix):
+        _, entries, postings, sizes = self._state
+        grams = trigrams(query, prefix=prefix)
+        hits = [postings[gram] for gram in grams if gram in postings]
+        if not hits:
+            return []
+        counts = np.bincount(np.concatenate(hits), minlength=len(entries))
+        query_coverage = counts / len(grams)
+        coverage = query_coverage if prefix else counts / np.maximum(sizes, 1)
+        eligible = np.flatnonzero(coverage >= MIN_COVERAGE)
+        if len(eligible) > CANDIDATES:
+            eligible = eligible[np.argpartition(-coverage[eligible], CANDIDATES - 1)[:CANDIDATES]]
+        return [(int(position), float(query_coverage[position])) for position in eligible]
+
+    @staticmethod
+    def _similarity(key, query, words, prefix, minimum):
+        if prefix:
+            return similarity(query, key[:len(query)], minimum)
+        # Windows of the entry's word count, give or take one, so split or
+        # merged words ("mid journey") still line up.
+        size = key.count(" ") + 1
+        windows = {
+            " ".join(words[start:start + width])
+            for width in range(max(1, size - 1), size + 2)
+            for start in range(max(1, len(words) - width + 1))
+        }
+        best = 0.0
+        for window in windows:
+            best = max(best, similarity(key, window, max(best, minimum)))
+        return best
+
+    def _ranked(self, query, limit, prefix):
+        """
+        [(entry position, similarity, ranking score), ...] best first. The
+        ranking score adds how much of the query the entry covers.
+        """
+        if self._state is None:
+            return []
+        entries = self._state[1]
+        query = normalize(query)
+        if not query:
+            return []
+        words = query.split(" ")
+        top = []  # min-heap of the limit best (ranking score, -position, similarity)
+        # Best covered first, so the heap fills with good matches early and
+        # its floor lets the edit distance give up on hopeless candidates.
+        for position, query_coverage in sorted(self._candidates(query, prefix), key=lambda c: -c[1]):
+            minimum = MIN_SIMILARITY
+            if len(top) == limit:
+                minimum = max(minimum, top[0][0] - QUERY_COVERAGE_WEIGHT * query_coverage)
+            score = self._similarity(entries[position][0], query, words, prefix, minimum)
+            if score < MIN_SIMILARITY:
+                continue
+            # -position breaks ties in favour of the more popular entry.
+            item = (score + QUERY_COVERAGE_WEIGHT * query_coverage, -position, score)
+            if len(top) < limit:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+        return [(-negative_position, score, rank) for rank, negative_position, score in sorted(top, reverse=True)]
+
+    def matches(self, query, limit=10, prefix=False):
+        """
+        Returns up to limit [{"text", "type", "id", "score"}] close to query,
+        best first; id is set for tools. With prefix=True the query is the
+        start of a name, as typed in the search bar.
+        """
+        entries = self._state[1] if self._state is not None else []
+        results = []
+        for position, score, _ in self._ranked(query, limit, prefix):
+            _, text, kind, tool_ids = entries[position]
+            results.append({
+                "text": text,
+                "type": kind,
+                "id": tool_ids[0] if kind == "tool" else None,
+                "score": round(score, 4),
+            })
+        return results
+
+    def search(self, query, limit=10):
+        """
+        Returns [(tool_id, score), ...] best first, like KeywordIndex.search().
+        A matched category contributes its tools, most popular first.
+        """
+        entries = self._state[1] if self._state is not None else []
+        results = {}
+        for position, _, score in self._ranked(query, min(limit, CANDIDATES), prefix=False):
+            _, _, kind, tool_ids = entries[position]
+            score *= 1.0 if kind == "tool" else CATEGORY_WEIGHT
+            for tool_id in tool_ids:
+                if score > results.get(tool_id, 0.0):
+                    results[tool_id] = score
+        # sorted() is stable: equal scores keep match order, then popularity order
+        return sorted(results.items(), key=lambda item: -item[1])[:limit]
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+from executors import run_in
+
+# Retrieval modes: both retrievers fused, or one of them alone.
+RETRIEVAL_MODES = ("hybrid", "keyword", "vector")
+# The usual RRF constant: dampens the weight of the very first ranks.
+RRF_K = 60
+# How deep each retriever's ranking goes into the fusion.
+CANDIDATES = 50
+# Vector hits below this cosine similarity are dropped: the nearest
+# neighbours of "qqqq" are still k tools, just unrelated ones.
+MIN_VECTOR_SIMILARITY = 0.3
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K, limit=None):
+    """
+    Fuses rankings ([(tool_id, score), ...] best first) by summing
+    1 / (k + rank) over the rankings each tool appears in. Only ranks
+    count, so BM25 and cosine scores need no normalization. Returns
+    [(tool_id, fused score), ...] best first.
+    """
+    fused = {}
+    for ranking in rankings:
+        for rank, (tool_id, _) in enumerate(ranking, 1):
+            fused[tool_id] = fused.get(tool_id, 0.0) + 1.0 / (k + rank)
+    # sorted() is stable: ties keep the order of the first ranking
+    ranked = sorted(fused.items(), key=lambda item: -item[1])
+    return ranked if limit is None else ranked[:limit]
+
+
+class HybridRetriever:
+    """
+    One retrieval engine for the chatbot and the consultant.
+
+    The lexical side is the BM25 KeywordIndex, falling back to the
+    FuzzyIndex when no query word is indexed. The vector side embeds the
+    query and searches the vector retriever. In "hybrid" mode both run
+    concurrently and their top CANDIDATES are fused with reciprocal-rank
+    fusion; "keyword" and "vector" run one side alone. Vector hits below
+    min_vector_similarity are dropped, so a query that matches nothing
+    still gets no results. Every call reports how long each stage took.
+    """
+
+    def __init__(self, keyword_index, vector_retriever, fuzzy_index=None, candidates=CANDIDATES, rrf_k=RRF_K,
+                 min_vector_similarity=MIN_VECTOR_SIMILARITY):
+        self.keyword_index = keyword_index
+        self.vector_retriever = vector_retriever
+        self.fuzzy_index = fuzzy_index
+        self.candidates = candidates
+        self.rrf_k = rrf_k
+        self.min_vector_similarity = min_vector_similarity
+
+    def lexical(self, query, limit):
+        matches = self.keyword_index.search(query, limit=limit)
+        if not matches and self.fuzzy_index is not None:
+            # Nothing indexed under those words; maybe a typo ("midjorney")
+            matches = self.fuzzy_index.search(query, limit=limit)
+        return matches
+
+    async def retrieve(self, query, limit=5, mode="hybrid", embed=None, executor=None, vector_timeout=None):
+        """
+        Returns (ranking, query_embedding, timings): [(tool_id, score), ...]
+        best first, the query embedding (None in "keyword" mode) and the
+        seconds spent per stage (keyword, embedding, vector, fusion, total).
+
+        embed is an async callable text -> embedding, needed unless mode is
+        "keyword"; the vector search runs on executor. In "hybrid" mode,
+        vector_timeout (seconds) bounds how long the vector side may take
+        after the BM25 lookup; past it the BM25 ranking is returned alone
+        and timings has a "vector_timeout" stage instead.
+        """
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode: {mode}")
+        timings = {}
+        start = time.perf_counter()
+        depth = limit if mode != "hybrid" else max(limit, self.candidates)
+
+        async def lexical_side():
+            stage_start = time.perf_counter()
+            matches = self.lexical(query, depth)
+            timings["keyword"] = time.perf_counter() - stage_start
+            return matches
+
+        async def vector_side():
+            # Own timings, merged by the caller: an abandoned search must not
+            # write into a result that has already been returned.
+            stage_start = time.perf_counter()
+            query_embedding = await embed(query)
+            embedded = time.perf_counter()
+            matches = await run_in(executor, self.vector_retriever.search_ids, query_embedding, limit=depth)
+            matches = [(tool_id, score) for tool_id, score in matches if score >= self.min_vector_similarity]
+            stages = {"embedding": embedded - stage_start, "vector": time.perf_counter() - embedded}
+            return query_embedding, matches, stages
+
+        query_embedding = None
+        if mode == "keyword":
+            ranking = await lexical_side()
+        elif mode == "vector":
+            query_embedding, ranking, stages = await vector_side()
+            timings.update(stages)
+        else:
+            # The vector side starts first: the BM25 lookup runs on the loop
+            # while the embedding is computed on the executor.
+            vector_task = asyncio.ensure_future(vector_side())
+            try:
+                lexical_matches = await lexical_side()
+            except BaseException:
+                vector_task.cancel()
+                raise
+            wait_start = time.perf_counter()
+            try:
+                # shield(): on timeout the embedding still completes (and is cached)
+                query_embedding, vector_matches, stages = await asyncio.wait_for(
+                    asyncio.shield(vector_task), vector_timeout
+                )
+            except asyncio.TimeoutError:
+                vector_task.add_done_callback(_consume_result)
+                timings["vector_timeout"] = time.perf_counter() - wait_start
+                ranking = lexical_matches
+            else:
+                timings.update(stages)
+                stage_start = time.perf_counter()
+                ranking = reciprocal_rank_fusion([lexical_matches, vector_matches], k=self.rrf_k, limit=limit)
+                timings["fusion"] = time.perf_counter() - stage_start
+        timings["total"] = time.perf_counter() - start
+        return ranking[:limit], query_embedding, timings
+
+
+def _consume_result(task):
+    # Retrieves the outcome of an abandoned vector search so a failure is
+    # not reported as "exception was never retrieved".
+    if not task.cancelled():
+        task.exception()
+
+
+def server_timing(timings):
+    """Formats stage timings (seconds) as a Server-Timing header value."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items())
@@ -0,0 +1,173 @@
+from datetime import datetime, timezone
+
+from catalog import EMBEDDING_FIELD, catalog_version, descending, pricing_bucket
+from response_cache import PrecompressedResponse
+
+INSIGHTS_META_ID = "insights"
+TOP_TOOLS = 10
+TOP_TOOLS_PER_CATEGORY = 5
+
+
+def _top(documents, field, limit):
+    ranked = sorted(documents, key=descending(field), reverse=True)[:limit]
+    return [
+        {"id": doc.get("id"), "name": doc.get("name"), "logoUrl": doc.get("logoUrl"), field: doc.get(field)}
+        for doc in ranked
+    ]
+
+
+def _release_month(doc):
+    """"YYYY-MM" of a releaseDate like "2023-05-14", or None."""
+    release_date = doc.get("releaseDate")
+    if not isinstance(release_date, str) or len(release_date) < 7 or release_date[4] != "-":
+        return None
+    month = release_date[:7]
+    return month if month[:4].isdigit() and month[5:].isdigit() else None
+
+
+def _counts(counter):
+    return [
+        {"name": name, "value": value}
+        for name, value in sorted(counter.items(), key=lambda item: (-item[1], item[0].lower()))
+    ]
+
+
+def compute_insights(documents):
+    """
+    Aggregates the statistics shown by the Insights and Trends pages and
+    the hero KPIs, from the tool documents (embeddings are ignored).
+
+    Categories are grouped case-insensitively and shown with the first
+    spelling seen, like the facets; pricing is given both as the raw
+    pricingModel values and as the filter buckets.
+    """
+    documents = list(documents)
+    labels = {}
+    members = {}
+    pricing_models = {}
+    pricing_buckets = {}
+    releases = {}
+    category_growth = {}
+    for doc in documents:
+        pricing_model = doc.get("pricingModel") or "Unknown"
+        pricing_models[pricing_model] = pricing_models.get(pricing_model, 0) + 1
+        bucket = pricing_bucket(doc.get("pricingModel"))
+        pricing_buckets.setdefault(bucket, [pricing_model.split(",")[0].strip() or "Unknown", 0])[1] += 1
+
+        month = _release_month(doc)
+        if month is not None:
+            releases[month] = releases.get(month, 0) + 1
+        for category in doc.get("categories") or []:
+            labels.setdefault(category.lower(), category)
+        for category in dict.fromkeys(c.lower() for c in doc.get("categories") or []):
+            members.setdefault(category, []).append(doc)
+            if month is not None:
+                category_growth[(month, category)] = category_growth.get((month, category), 0) + 1
+
+    categories = []
+    top_by_category = []
+    for key, docs in members.items():
+        average = sum(doc.get("trendScore") or 0 for doc in docs) / len(docs)
+        categories.append({"category": labels[key], "count": len(docs), "averageTrendScore": round(average, 2)})
+        # A list rather than a dict keyed by category: labels may contain "." or "$"
+        top_by_category.append({
+            "category": labels[key],
+            "popularity": _top(docs, "popularity", TOP_TOOLS_PER_CATEGORY),
+            "trendScore": _top(docs, "trendScore", TOP_TOOLS_PER_CATEGORY),
+        })
+    categories.sort(key=lambda entry: (-entry["count"], entry["category"].lower()))
+    top_by_category.sort(key=lambda entry: entry["category"].lower())
+
+    top_trending = _top(documents, "trendScore", 1)
+    fastest_growth = max(categories, key=lambda entry: entry["averageTrendScore"], default=None)
+    years = {}
+    for month, count in releases.items():
+        years[month[:4]] = years.get(month[:4], 0) + count
+
+    return {
+        "kpis": {
+            "totalTools": len(documents),
+            "topTrendingTool": top_trending[0] if top_trending else None,
+            "fastestGrowthCategory": fastest_growth,
+        },
+        "categoryCounts": categories,
+        "pricingModelCounts": _counts(pricing_models),
+        "pricingBucketCounts": [
+            {"bucket": bucket, "name": name, "value": value}
+            for bucket, (name, value) in sorted(pricing_buckets.items(), key=lambda item: (-item[1][1], item[0]))
+        ],
+        "topByPopularity": _top(documents, "popularity", TOP_TOOLS),
+        "topByTrendScore": _top(documents, "trendScore", TOP_TOOLS),
+        "topByCategory": top_by_category,
+        "releasesByMonth": [{"month": month, "count": releases[month]} for month in sorted(releases)],
+        "releasesByYear": [{"year": year, "count": years[year]} for year in sorted(years)],
+        "categoryGrowth": [
+            {"month": month, "category": labels[category], "value": value}
+            for (month, category), value in sorted(category_growth.items())
+        ],
+    }
+
+
+def refresh_insights(db):
+    """
+    Recomputes the insights from the tools collection and stores them as
+    one materialized document in catalog_meta, tagged with the catalog
+    version they were computed from. Call this after loading tools and
+    before mark_catalog_updated(), so API workers find it on their reload.
+    """
+    # catalog_version() ignores embeddings, so this matches the API's snapshot
+    # whether or not it loads them
+    documents = list(db.tools.find({}, {"_id": 0, EMBEDDING_FIELD: 0}))
+    insights = compute_insights(documents)
+    db.catalog_meta.replace_one(
+        {"_id": INSIGHTS_META_ID},
+        {
+            "catalogVersion": catalog_version(documents),
+            "generatedAt": datetime.now(timezone.utc),
+            "insights": insights,
+        },
+        upsert=True,
+    )
+    print(f"✅ Insights refreshed for {len(documents)} tools.")
+    return insights
+
+
+class InsightsStore:
+    """
+    Serves the materialized insights from memory, serialized and
+    compressed once per catalog version.
+
+    update(snapshot) loads the document written by refresh_insights(); if
+    that is missing or was computed from another catalog version (e.g. a
+    script that changed the tools without refreshing it), the insights are
+    computed from the snapshot instead.
+    """
+
+    def __init__(self, meta_collection):
+        self.meta_collection = meta_collection
+        self.response = None
+
+    def _load_materialized(self, version):
+        if self.meta_collection is None:
+            return None
+        try:
+            stored = self.meta_collection.find_one({"_id": INSIGHTS_META_ID})
+        except Exception as e:
+            print(f"⚠️ Could not read the materialized insights: {e}")
+            return None
+        if not stored or stored.get("catalogVersion") != version:
+            return None
+        return stored
+
+    def update(self, snapshot):
+        stored = self._load_materialized(snapshot.version)
+        if stored is not None:
+            insights, generated_at = stored["insights"], stored["generatedAt"]
+            if generated_at.tzinfo is None:
+                generated_at = generated_at.replace(tzinfo=timezone.utc)  # pymongo returns naive UTC
+        else:
+            print("⚠️ Materialized insights are missing or stale, computing them from the catalog.")
+            insights, generated_at = compute_insights(snapshot.documents), datetime.now(timezone.utc)
+        content = {**insights, "catalogVersion": snapshot.version, "generatedAt": generated_at.isoformat()}
+        self.response = PrecompressedResponse(content)
+        print(f"✅ Insights ready (catalog version {snapshot.version}).")
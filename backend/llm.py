@@ -0,0 +1,77 @@
+import asyncio
+import threading
+
+
+class GeminiClient:
+    """
+    Thin wrapper so the API talks to any LLM through agenerate(prompt) -> str
+    and astream(prompt).
+
+    google.generativeai takes a while to import, so it is imported and
+    configured by load() (the startup warm-up) or on first use.
+    """
+
+    def __init__(self, model_name, api_key):
+        self.model_name = model_name
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    @property
+    def model(self):
+        return self.load()
+
+    async def agenerate(self, prompt):
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+    async def astream(self, prompt):
+        """Yields text chunks as Gemini produces them."""
+        response = await self.model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeLLMClient:
+    """
+    Deterministic stand-in for offline runs, benchmarks and tests
+    (LLM_BACKEND=fake). It can simulate generation latency; when streaming,
+    the delay is spread evenly over the chunks.
+    """
+
+    def __init__(self, reply=None, delay_seconds=0.0):
+        self.reply = reply
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+
+    def load(self):
+        return None
+
+    def _reply_for(self, prompt):
+        if self.reply is not None:
+            return self.reply
+        return f"**Recommended stack** (fake LLM, {len(prompt)} prompt characters)"
+
+    async def agenerate(self, prompt):
+        self.calls += 1
+        if self.delay_seconds:
+            await asyncio.sleep(self.delay_seconds)
+        return self._reply_for(prompt)
+
+    async def astream(self, prompt):
+        self.calls += 1
+        words = self._reply_for(prompt).split(" ")
+        for i, word in enumerate(words):
+            if self.delay_seconds:
+                await asyncio.sleep(self.delay_seconds / len(words))
+            yield word if i == 0 else f" {word}"
@@ -0,0 +1,76 @@
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from pymongo import monitoring
+
+# Seconds; fine-grained at the low end where the in-memory endpoints live
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class ComponentCollector(Collector):
+    """
+    Exports the stats() of existing components (caches, consultant admission
+    control, query-embedding batching, the catalog) at scrape time, so those
+    components keep no metric objects of their own.
+
+    caches maps a cache label to an object with stats(); catalog may be None.
+    """
+
+    def __init__(self, caches, admission, batcher, catalog):
+        self.caches = caches
+        self.admission = admission
+        self.batcher = batcher
+        self.catalog = catalog
+
+    def collect(self):
+        cache_hits = CounterMetricFamily("cache_hits", "Cache hits.", labels=["cache"])
+        cache_misses = CounterMetricFamily("cache_misses", "Cache misses.", labels=["cache"])
+        cache_hit_ratio = GaugeMetricFamily("cache_hit_ratio", "Hits over lookups since start.", labels=["cache"])
+        cache_entries = GaugeMetricFamily("cache_entries", "Entries currently cached.", labels=["cache"])
+        for name, cache in self.caches.items():
+            stats = cache.stats()
+            cache_hits.add_metric([name], stats["hits"])
+            cache_misses.add_metric([name], stats["misses"])
+            cache_hit_ratio.add_metric([name], stats["hitRatio"])
+            cache_entries.add_metric([name], stats["size"])
+        yield from (cache_hits, cache_misses, cache_hit_ratio, cache_entries)
+
+        admission = self.admission.stats()
+        yield GaugeMetricFamily(
+            "consultant_requests_active", "Consultant requests holding a slot.", value=admission["active"]
+        )
+        yield GaugeMetricFamily(
+            "consultant_queue_depth", "Consultant requests waiting for a slot.", value=admission["queued"]
+        )
+        yield GaugeMetricFamily(
+            "consultant_queue_depth_max", "Highest consultant queue depth since start.", value=admission["maxQueued"]
+        )
+        rejected = CounterMetricFamily("consultant_rejected", "Consultant requests turned away.", labels=["reason"])
+        for reason, count in admission["rejected"].items():
+            rejected.add_metric([reason], count)
+        yield rejected
+
+        batching = self.batcher.stats()
+        yield CounterMetricFamily("embedding_batches", "Batched query-embedding model calls.", value=batching["batches"])
+        yield CounterMetricFamily(
+            "embedding_batch_items", "Query embeddings computed in batches.", value=batching["items"]
+        )
+        yield GaugeMetricFamily(
+            "catalog_tools", "Tools in the in-memory catalog snapshot.",
+            value=len(self.catalog.snapshot) if self.catalog is not None else 0,
+        )
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """pymongo command listener that records each command's duration."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.histogram.labels(command=event.command_name, outcome="success").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        self.histogram.labels(command=event.command_name, outcome="failure").observe(event.duration_micros / 1e6)
@@ -0,0 +1,69 @@
+import os
+from pymongo import MongoClient, ReplaceOne
+from dotenv import load_dotenv
+from consultant_history import ConsultantHistory
+
+def migrate_consultant_history():
+    """
+    Moves the consultant_history arrays embedded in user documents into the
+    consultant_history collection (one document per conversation), then
+    removes the arrays. Safe to re-run: entries are upserted on
+    (email, timestamp, prompt), so an interrupted run does not duplicate them.
+    """
+    # --- 1. Load Environment Variables ---
+    load_dotenv()
+    mongo_uri = os.getenv("MONGO_URI")
+
+    if not mongo_uri:
+        print("Error: MONGO_URI not found in .env file.")
+        return
+
+    # --- 2. Connect to MongoDB ---
+    try:
+        print("Connecting to MongoDB...")
+        client = MongoClient(mongo_uri)
+        db = client.GenAI_DB
+        client.admin.command('ping')
+        print("✅ MongoDB connection successful.")
+    except Exception as e:
+        print(f"Error connecting to MongoDB: {e}")
+        return
+
+    # --- 3. Copy each user's embedded history, then drop the array ---
+    try:
+        history = ConsultantHistory(db.consultant_history)
+        history.ensure_indexes()
+
+        users = db.users.find(
+            {"consultant_history.0": {"$exists": True}},
+            {"email": 1, "consultant_history": 1},
+        )
+        migrated_users = migrated_entries = 0
+        for user in users:
+            operations = []
+            for entry in user["consultant_history"]:
+                document = {
+                    "email": user["email"],
+                    "prompt": entry.get("prompt"),
+                    "recommendation": entry.get("recommendation"),
+                    "timestamp": entry.get("timestamp"),
+                }
+                key = {field: document[field] for field in ("email", "timestamp", "prompt")}
+                operations.append(ReplaceOne(key, document, upsert=True))
+            db.consultant_history.bulk_write(operations, ordered=False)
+            db.users.update_one({"_id": user["_id"]}, {"$unset": {"consultant_history": ""}})
+            migrated_users += 1
+            migrated_entries += len(operations)
+
+        print("\n✅ Consultant history migration complete!")
+        print(f"Moved {migrated_entries} conversations of {migrated_users} users.")
+
+    except Exception as e:
+        print(f"An error occurred during the migration: {e}")
+    finally:
+        client.close()
+        print("MongoDB connection closed.")
+
+
+if __name__ == "__main__":
+    migrate_consultant_history()
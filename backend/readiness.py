@@ -0,0 +1,33 @@
+import threading
+import time
+
+
+class Readiness:
+    """
+    Warm-up state of the components the API needs before it can serve
+    everything (database, catalog, models), reported by /readyz.
+    """
+
+    def __init__(self, components):
+        self._lock = threading.Lock()
+        self._started_at = time.time()
+        self._components = {name: {"ready": False} for name in components}
+
+    def mark_ready(self, name):
+        with self._lock:
+            self._components[name] = {
+                "ready": True,
+                "readyAfterSeconds": round(time.time() - self._started_at, 3),
+            }
+
+    def mark_failed(self, name, error):
+        with self._lock:
+            self._components[name] = {"ready": False, "error": str(error)}
+
+    def status(self):
+        with self._lock:
+            components = {name: dict(component) for name, component in self._components.items()}
+        return {
+            "ready": all(component["ready"] for component in components.values()),
+            "components": components,
+        }
@@ -0,0 +1,132 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi import Request, Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, we fall back to gzip/identity
+    brotli = None
+
+# Preferred order when the client accepts several encodings equally.
+ENCODING_PREFERENCE = ["br", "gzip", "identity"]
+# Quality 11 takes seconds on the tool list for ~20% fewer bytes than 5.
+BROTLI_QUALITY = 5
+
+
+def _parse_accept_encoding(header):
+    """Returns {encoding: q} for an Accept-Encoding header."""
+    accepted = {}
+    for part in (header or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    return accepted
+
+
+def _parse_if_none_match(header):
+    tags = set()
+    for tag in (header or "").split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag:
+            tags.add(tag)
+    return tags
+
+
+class PrecompressedResponse:
+    """
+    A JSON payload serialized and compressed once, ready to be served as-is.
+
+    Each encoding gets its own strong ETag (they are different byte
+    representations), but any of them satisfies If-None-Match since they all
+    carry the same content.
+    """
+
+    def __init__(self, content):
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:32]
+
+        self.bodies = {"identity": body, "gzip": gzip.compress(body, compresslevel=9)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.bodies
+        }
+
+    def choose_encoding(self, accept_encoding):
+        accepted = _parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*")
+        best, best_q = "identity", 0.0
+        for encoding in ENCODING_PREFERENCE:
+            if encoding not in self.bodies:
+                continue
+            q = accepted.get(encoding, wildcard if wildcard is not None else 0.0)
+            if encoding == "identity" and "identity" not in accepted and wildcard is None:
+                q = 0.001  # identity is always acceptable unless explicitly refused
+            if q > best_q:
+                best, best_q = encoding, q
+        return best
+
+    def to_response(self, request: Request, headers=None):
+        encoding = self.choose_encoding(request.headers.get("accept-encoding"))
+        response_headers = {
+            "ETag": self.etags[encoding],
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+        }
+        if headers:
+            response_headers.update(headers)
+
+        requested = _parse_if_none_match(request.headers.get("if-none-match"))
+        if "*" in requested or requested & set(self.etags.values()):
+            return Response(status_code=304, headers=response_headers)
+
+        if encoding != "identity":
+            response_headers["Content-Encoding"] = encoding
+        return Response(
+            content=self.bodies[encoding],
+            media_type="application/json",
+            headers=response_headers,
+        )
+
+
+class VersionedResponseCache:
+    """
+    Keeps one PrecompressedResponse per catalog version.
+
+    Register rebuild() as a catalog listener; build(snapshot) returns the
+    JSON-serializable content to cache. While the listener builds a new
+    version, get() keeps serving the previous one.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self._lock = threading.Lock()
+        self._state = None  # (version, PrecompressedResponse)
+
+    def rebuild(self, snapshot):
+        self._state = (snapshot.version, PrecompressedResponse(self.build(snapshot)))
+
+    def get(self, snapshot):
+        state = self._state
+        if state is None:
+            # Only before the listener's first build; one request builds it
+            with self._lock:
+                if self._state is None:
+                    self.rebuild(snapshot)
+                state = self._state
+        return state[1]
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+
+import numpy as np
+
+from ann_index import MANIFEST_FILE, IVFIndex, normalize_rows
+from catalog import EMBEDDING_FIELD
+
+# Fields the consultant needs from each retrieved tool.
+RETRIEVAL_FIELDS = ("id", "name", "description", "website", "categories")
+
+
+def project_for_retrieval(tool):
+    return {field: tool.get(field) for field in RETRIEVAL_FIELDS if field in tool}
+
+
+class AtlasVectorRetriever:
+    """Retrieves with MongoDB Atlas `$vectorSearch` (needs an Atlas cluster and index)."""
+
+    def __init__(self, tools_collection, index_name="vector_index", num_candidates=100):
+        self.tools_collection = tools_collection
+        self.index_name = index_name
+        self.num_candidates = num_candidates
+
+    def _vector_search_stage(self, query_embedding, limit):
+        return {"$vectorSearch": {
+            "index": self.index_name,
+            "path": "description_embedding",
+            "queryVector": np.asarray(query_embedding, dtype=np.float32).tolist(),
+            "numCandidates": max(self.num_candidates, limit),
+            "limit": limit,
+        }}
+
+    def search_ids(self, query_embedding, limit=5):
+        """Returns [(tool_id, cosine similarity), ...], best first."""
+        search_pipeline = [
+            self._vector_search_stage(query_embedding, limit),
+            {"$project": {"id": 1, "_id": 0, "score": {"$meta": "vectorSearchScore"}}},
+        ]
+        # A cosine index scores (1 + cosine) / 2; map it back like the local retrievers
+        return [(doc["id"], 2 * doc["score"] - 1) for doc in self.tools_collection.aggregate(search_pipeline)]
+
+
+class ExactVectorRetriever:
+    """
+    Exact cosine search over every tool embedding held in memory.
+
+    All vectors live in one contiguous, row-normalized float32 matrix, so a
+    query is a single matrix-vector product plus a partial sort. update()
+    rebuilds the matrix when the catalog changes.
+    """
+
+    def __init__(self):
+        # (tool ids, normalized matrix)
+        self._state = ([], np.zeros((0, 0), dtype=np.float32))
+
+    def __len__(self):
+        return len(self._state[0])
+
+    def update(self, snapshot):
+        ids = [tool_id for tool_id in snapshot.embeddings if tool_id in snapshot.by_id]
+        if ids:
+            matrix = np.ascontiguousarray(
+                normalize_rows(np.asarray([snapshot.embeddings[tool_id] for tool_id in ids], dtype=np.float32))
+            )
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        self._state = (ids, matrix)
+        print(f"✅ Vector index loaded: {len(ids)} embeddings.")
+
+    def search_ids(self, query_embedding, limit=5):
+        """Returns [(tool_id, cosine similarity), ...], best first."""
+        ids, matrix = self._state
+        if not ids:
+            return []
+        return [(ids[row], score) for row, score in self._top_k(matrix, query_embedding, limit)]
+
+    @staticmethod
+    def _top_k(matrix, query_embedding, limit):
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return []
+        scores = matrix @ (query / norm)
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+
+class ANNVectorRetriever:
+    """
+    Approximate search over an IVFIndex built by enrich_database.py.
+
+    The saved index is memory-mapped at startup. update() then applies the
+    difference with the catalog as incremental inserts/deletes, fetching
+    from Mongo only the embeddings of tools it has not indexed yet, so the
+    catalog can be loaded without embeddings. New tools are searchable
+    before the next offline rebuild. Without a saved index it falls back to
+    building one in memory.
+    """
+
+    def __init__(self, index_dir, tools_collection):
+        self.index_dir = index_dir
+        self.tools_collection = tools_collection
+        self.index = None
+        self._lock = threading.Lock()
+        if os.path.exists(os.path.join(index_dir, MANIFEST_FILE)):
+            self.index = IVFIndex.load(index_dir)
+            print(f"✅ ANN index memory-mapped: {len(self.index)} vectors (version {self.index.version}).")
+        else:
+            print(f"⚠️ No ANN index found in {index_dir}, it will be built in memory from the catalog.")
+
+    def __len__(self):
+        return len(self.index) if self.index is not None else 0
+
+    def _reload_if_rebuilt(self):
+        # enrich_database.py rewrites the saved index; pick up a new version.
+        manifest_path = os.path.join(self.index_dir, MANIFEST_FILE)
+        if not os.path.exists(manifest_path):
+            return
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            version = json.load(f).get("version")
+        if self.index is None or version != self.index.version:
+            self.index = IVFIndex.load(self.index_dir)
+            print(f"✅ ANN index reloaded from disk (version {self.index.version}).")
+
+    def _fetch_embeddings(self, tool_ids, chunk_size=1000):
+        """{tool_id: embedding} for those of tool_ids that have one."""
+        tool_ids = sorted(tool_ids)
+        embeddings = {}
+        for start in range(0, len(tool_ids), chunk_size):
+            cursor = self.tools_collection.find(
+                {"id": {"$in": tool_ids[start:start + chunk_size]}, EMBEDDING_FIELD: {"$exists": True}},
+                {"_id": 0, "id": 1, EMBEDDING_FIELD: 1},
+            )
+            embeddings.update((doc["id"], doc[EMBEDDING_FIELD]) for doc in cursor)
+        return embeddings
+
+    def update(self, snapshot):
+        current = set(snapshot.by_id)
+        with self._lock:
+            self._reload_if_rebuilt()
+            live = set(self.index.live_ids()) if self.index is not None else set()
+        # Embeddings are never rewritten by the enrichment step, so comparing
+        # ids is enough to find what changed. A tool embedded after it was
+        # first seen also gets its similarTools then, which changes the
+        # catalog version and brings it back here.
+        embeddings = self._fetch_embeddings(current - live)
+        stale = live - current
+        with self._lock:
+            if self.index is None:
+                if not embeddings:
+                    return
+                ids = sorted(embeddings)
+                self.index = IVFIndex.build(ids, [embeddings[tool_id] for tool_id in ids])
+            else:
+                for tool_id in stale:
+                    self.index.remove(tool_id)
+                for tool_id, embedding in embeddings.items():
+                    self.index.add(tool_id, embedding)
+        print(f"✅ ANN index synced with catalog: {len(embeddings)} inserted, {len(stale)} deleted.")
+
+    def search_ids(self, query_embedding, limit=5):
+        # The lock only serializes update(); a rebuilt index is swapped in whole
+        index = self.index
+        if index is None:
+            return []
+        return index.search(query_embedding, k=limit)
+
+
+def create_retriever(kind, tools_collection=None, ann_index_dir=None):
+    """Builds the retriever named by VECTOR_RETRIEVER ("local", "ann" or "atlas")."""
+    if kind == "atlas":
+        return AtlasVectorRetriever(tools_collection)
+    if kind == "local":
+        return ExactVectorRetriever()
+    if kind == "ann":
+        return ANNVectorRetriever(ann_index_dir, tools_collection)
+    raise ValueError(f"Unknown vector retriever: {kind}")
@@ -8,6 +8,8 @@ from datetime import datetime
 import random
 from pymongo import MongoClient, UpdateOne
 from dotenv import load_dotenv
+from catalog import ensure_tool_indexes, mark_catalog_updated
+from insights import refresh_insights
 
 # --- Helper Functions ---
 def run_script(script_path):
@@ -144,9 +146,15 @@ def main():
     
     if bulk_operations:
         try:
+            # The upserts match on "id"; the unique index keeps them from scanning or duplicating
+            ensure_tool_indexes(tools_collection)
             result = tools_collection.bulk_write(bulk_operations)
             print("Database update complete!")
             print(f"  - Matched: {result.matched_count}, Upserted: {result.upserted_count}, Modified: {result.modified_count}")
+            # Materialize the Insights/Trends aggregates, then tell running
+            # API workers to reload their catalog snapshot (and the aggregates)
+            refresh_insights(db)
+            mark_catalog_updated(db)
         except Exception as e:
             print(f"An error occurred during database update: {e}")
 
@@ -0,0 +1,210 @@
+import hashlib
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+STOP_WORDS = {
+    "i", "me", "my", "myself", "we", "our", "ours", "ourselves", "you", "your",
+    "he", "him", "his", "she", "her", "it", "its", "they", "them", "their",
+    "what", "which", "who", "whom", "this", "that", "these", "those", "am",
+    "is", "are", "was", "were", "be", "been", "being", "have", "has", "had",
+    "do", "does", "did", "a", "an", "the", "and", "but", "if", "or", "because",
+    "as", "until", "while", "of", "at", "by", "for", "with", "about", "to",
+    "from", "in", "out", "on", "off", "over", "under", "again", "further",
+    "then", "once", "here", "there", "when", "where", "why", "how", "all",
+    "any", "both", "each", "few", "more", "most", "other", "some", "such",
+    "no", "nor", "not", "only", "own", "same", "so", "than", "too", "very",
+    "can", "will", "just", "don", "should", "now", "find", "show", "give", "me"
+}
+
+# How much each field contributes to a term's frequency (a simple BM25F).
+FIELD_WEIGHTS = {"name": 3.0, "description": 1.0, "keyFeatures": 1.5}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Popularity can at most multiply the relevance score by (1 + POPULARITY_WEIGHT).
+POPULARITY_WEIGHT = 0.3
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_VOWELS = set("aeiou")
+
+# Suffix rules applied in order, the first match wins: (suffix, replacement, min stem length).
+_SUFFIX_RULES = [
+    ("ational", "ate", 3),
+    ("ization", "ize", 3),
+    ("fulness", "ful", 3),
+    ("iveness", "ive", 3),
+    ("ations", "ate", 3),
+    ("ation", "ate", 3),
+    ("ness", "", 3),
+    ("ments", "", 3),
+    ("ment", "", 3),
+    ("ingly", "", 3),
+    ("edly", "", 3),
+    ("ing", "", 3),
+    ("ies", "y", 2),
+    ("ied", "y", 2),
+    ("ers", "", 3),
+    ("er", "", 3),
+    ("ors", "", 3),
+    ("or", "", 3),
+    ("ed", "", 3),
+    ("ly", "", 3),
+    ("sses", "ss", 2),
+    ("s", "", 3),
+]
+
+
+def stem(word):
+    """
+    A small suffix-stripping stemmer. It is not linguistically complete, it
+    only has to map query and document words to the same key
+    ("generators" / "generating" / "generate" -> "generat").
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    for suffix, replacement, min_stem in _SUFFIX_RULES:
+        if not word.endswith(suffix):
+            continue
+        if suffix == "s" and word.endswith(("ss", "us", "is")):
+            return word
+        base = word[: -len(suffix)]
+        if len(base) < min_stem or not (_VOWELS & set(base)):
+            return word
+        word = base + replacement
+        break
+    # Drop a trailing 'e' so that "generate" and "generat(ing)" share a stem.
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    """Lowercases, splits on non-alphanumerics, drops STOP_WORDS and stems."""
+    if not text:
+        return []
+    return [stem(token) for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS]
+
+
+def _field_text(value):
+    if isinstance(value, list):
+        return " ".join(str(item) for item in value if item)
+    return str(value) if value else ""
+
+
+class KeywordIndex:
+    """
+    In-memory inverted index over tool name, description and keyFeatures,
+    ranked with BM25 and blended with popularity.
+
+    update(snapshot) only re-tokenizes tools whose indexed fields changed
+    and drops removed ones. The per-posting BM25 impacts (idf * saturated tf) and popularity
+    boosts are then recomputed so a query is only a few dict lookups and sums.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {}      # term -> {tool_id: weighted tf}
+        self._doc_terms = {}     # tool_id -> Counter of weighted tf
+        self._doc_lengths = {}   # tool_id -> weighted length
+        self._signatures = {}    # tool_id -> hash of the indexed content
+        self._popularity = {}    # tool_id -> popularity
+        self._total_length = 0.0
+        # (term -> {tool_id: precomputed BM25 contribution}, tool_id -> popularity multiplier)
+        self._tables = ({}, {})
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    @staticmethod
+    def _signature(tool):
+        content = "\x1f".join(_field_text(tool.get(field)) for field in FIELD_WEIGHTS)
+        return hashlib.sha1(f"{content}\x1e{tool.get('popularity')}".encode("utf-8")).hexdigest()
+
+    def _remove(self, tool_id):
+        terms = self._doc_terms.pop(tool_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(tool_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(tool_id, 0.0)
+        self._signatures.pop(tool_id, None)
+        self._popularity.pop(tool_id, None)
+
+    def _add(self, tool_id, tool, signature):
+        terms = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(_field_text(tool.get(field))):
+                terms[token] += weight
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[tool_id] = tf
+        length = sum(terms.values())
+        self._doc_terms[tool_id] = terms
+        self._doc_lengths[tool_id] = length
+        self._total_length += length
+        self._signatures[tool_id] = signature
+        self._popularity[tool_id] = tool.get("popularity") or 0
+
+    def update(self, snapshot):
+        """Brings the index in line with a catalog snapshot, incrementally."""
+        with self._lock:
+            current = snapshot.by_id
+            removed = [tool_id for tool_id in self._doc_terms if tool_id not in current]
+            for tool_id in removed:
+                self._remove(tool_id)
+
+            changed = 0
+            for tool_id, tool in current.items():
+                signature = self._signature(tool)
+                if self._signatures.get(tool_id) == signature:
+                    continue
+                self._remove(tool_id)
+                self._add(tool_id, tool, signature)
+                changed += 1
+
+            if changed or removed:
+                self._rebuild_impacts()
+        print(f"✅ Keyword index updated: {changed} tools (re)indexed, {len(removed)} removed.")
+
+    def _rebuild_impacts(self):
+        doc_count = len(self._doc_terms)
+        avg_length = self._total_length / doc_count if doc_count else 0.0
+        norms = {
+            tool_id: BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+            for tool_id, length in self._doc_lengths.items()
+        }
+        impacts = {}
+        for term, postings in self._postings.items():
+            idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            impacts[term] = {
+                tool_id: idf * tf * (BM25_K1 + 1) / (tf + norms[tool_id])
+                for tool_id, tf in postings.items()
+            }
+
+        max_popularity = max(self._popularity.values(), default=0)
+        scale = math.log1p(max_popularity) if max_popularity > 0 else 0.0
+        boosts = {
+            tool_id: 1 + POPULARITY_WEIGHT * math.log1p(popularity) / scale if scale else 1.0
+            for tool_id, popularity in self._popularity.items()
+        }
+        self._tables = (impacts, boosts)
+
+    def search(self, query, limit=10):
+        """Returns [(tool_id, score), ...] for the best matches, best first."""
+        terms = tokenize(query)
+        impacts, boosts = self._tables
+        scores = {}
+        for term in set(terms):
+            for tool_id, impact in impacts.get(term, {}).items():
+                scores[tool_id] = scores.get(tool_id, 0.0) + impact
+        return heapq.nlargest(
+            limit,
+            ((tool_id, score * boosts[tool_id]) for tool_id, score in scores.items()),
+            key=lambda item: item[1],
+        )
@@ -2,6 +2,8 @@ import json
 import os
 from pymongo import MongoClient
 from dotenv import load_dotenv
+from catalog import ensure_tool_indexes, mark_catalog_updated
+from insights import refresh_insights
 
 def seed_data():
     """
@@ -46,12 +48,15 @@ def seed_data():
     try:
         print("Clearing existing data in the 'tools' collection...")
         tools_collection.delete_many({}) # Clear the collection to avoid duplicates on re-runs
+        ensure_tool_indexes(tools_collection) # Before inserting, so a duplicate id fails loudly
 
         print(f"Inserting {len(tools_data)} tools into the database...")
         result = tools_collection.insert_many(tools_data)
         
         print("\n✅ Database seeding complete!")
         print(f"Successfully inserted {len(result.inserted_ids)} documents.")
+        refresh_insights(db)
+        mark_catalog_updated(db)
         
     except Exception as e:
         print(f"An error occurred during database insertion: {e}")
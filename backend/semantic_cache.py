@@ -0,0 +1,105 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Caches LLM answers for prompts that are semantically near-identical.
+
+    An entry is reused only when the retrieved tool IDs are exactly the same
+    set and the cosine similarity between query embeddings reaches the
+    threshold, so the answer was generated from the same context. Entries are
+    bounded (LRU), expire after ttl_seconds and are dropped whenever the
+    catalog version changes.
+    """
+
+    def __init__(self, threshold=0.95, ttl_seconds=900, max_size=512, clock=time.monotonic):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.clock = clock
+        self.catalog_version = None
+        self.hits = 0
+        self.misses = 0
+        self._groups = {}             # tool key -> {entry number: (unit vector, response, expires_at)}
+        self._order = OrderedDict()   # entry number -> tool key, oldest first
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._order)
+
+    @staticmethod
+    def _tool_key(tool_ids):
+        return tuple(sorted(tool_ids))
+
+    @staticmethod
+    def _unit(embedding):
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def invalidate(self, snapshot=None):
+        """Drops every entry; register as a catalog listener."""
+        with self._lock:
+            self._groups.clear()
+            self._order.clear()
+            self.catalog_version = snapshot.version if snapshot is not None else None
+
+    def _drop(self, entry_no):
+        tool_key = self._order.pop(entry_no)
+        group = self._groups[tool_key]
+        del group[entry_no]
+        if not group:
+            del self._groups[tool_key]
+
+    def lookup(self, embedding, tool_ids, catalog_version=None):
+        """Returns a cached response or None."""
+        if catalog_version != self.catalog_version:
+            self.misses += 1
+            return None
+        query = self._unit(embedding)
+        now = self.clock()
+        with self._lock:
+            group = self._groups.get(self._tool_key(tool_ids), {})
+            best_entry, best_score = None, self.threshold
+            for entry_no, (vector, _, expires_at) in list(group.items()):
+                if expires_at <= now:
+                    self._drop(entry_no)
+                    continue
+                score = float(vector @ query)
+                if score >= best_score:
+                    best_entry, best_score = entry_no, score
+            if best_entry is None:
+                self.misses += 1
+                return None
+            self._order.move_to_end(best_entry)
+            self.hits += 1
+            return group[best_entry][1]
+
+    def store(self, embedding, tool_ids, response, catalog_version=None):
+        # A request that started before a catalog reload must not repopulate the cache.
+        if catalog_version != self.catalog_version:
+            return
+        tool_key = self._tool_key(tool_ids)
+        with self._lock:
+            entry_no = next(self._counter)
+            self._groups.setdefault(tool_key, {})[entry_no] = (
+                self._unit(embedding), response, self.clock() + self.ttl_seconds
+            )
+            self._order[entry_no] = tool_key
+            while len(self._order) > self.max_size:
+                self._drop(next(iter(self._order)))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._order),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,68 @@
+import numpy as np
+from pymongo import UpdateOne
+
+from ann_index import normalize_rows
+from catalog import EMBEDDING_FIELD
+
+# Stored on each tool as [{"id", "score"}, ...], most similar first.
+SIMILAR_FIELD = "similarTools"
+SIMILAR_K = 10
+# Rows scored per matrix product; bounds memory to batch_size x tools floats.
+BATCH_SIZE = 256
+
+
+def knn_graph(ids, vectors, k=SIMILAR_K, batch_size=BATCH_SIZE):
+    """
+    Exact top-k cosine neighbours of every vector among the others.
+
+    The rows are scored batch_size at a time against the whole normalized
+    matrix (one matrix product per batch), then each row keeps its k best
+    with argpartition. Returns {id: [(neighbour id, similarity), ...]}.
+    """
+    matrix = np.ascontiguousarray(normalize_rows(np.asarray(vectors, dtype=np.float32)))
+    count = len(ids)
+    k = min(k, count - 1)
+    graph = {}
+    if k <= 0:
+        return {tool_id: [] for tool_id in ids}
+    for start in range(0, count, batch_size):
+        scores = matrix[start:start + batch_size] @ matrix.T
+        rows = np.arange(len(scores))
+        scores[rows, start + rows] = -np.inf  # a tool is not its own neighbour
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        for row in rows:
+            graph[ids[start + row]] = [
+                (ids[neighbour], float(score)) for neighbour, score in zip(top[row], top_scores[row])
+            ]
+    return graph
+
+
+def build_similar_tools(tools_collection, k=SIMILAR_K):
+    """
+    Computes the similar-tools graph over every stored embedding and writes
+    each tool's neighbours to its SIMILAR_FIELD. Returns the number of tools
+    updated.
+    """
+    print("\nComputing similar tools from the embeddings...")
+    docs = list(tools_collection.find(
+        {EMBEDDING_FIELD: {"$exists": True}, "id": {"$exists": True}},
+        {"_id": 0, "id": 1, EMBEDDING_FIELD: 1},
+    ))
+    if len(docs) < 2:
+        print("Not enough embeddings, skipping similar tools.")
+        return 0
+    graph = knn_graph([doc["id"] for doc in docs], [doc[EMBEDDING_FIELD] for doc in docs], k=k)
+    operations = [
+        UpdateOne(
+            {"id": tool_id},
+            {"$set": {SIMILAR_FIELD: [{"id": neighbour, "score": round(score, 4)} for neighbour, score in neighbours]}},
+        )
+        for tool_id, neighbours in graph.items()
+    ]
+    tools_collection.bulk_write(operations, ordered=False)
+    print(f"✅ Similar tools stored for {len(operations)} tools ({k} each).")
+    return len(operations)
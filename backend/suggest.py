@@ -0,0 +1,152 @@
+import bisect
+import re
+
+MAX_SUGGESTIONS = 20
+# Prefixes matching more keys than this get their ranking precomputed, so a
+# query never ranks more than this many keys.
+PRECOMPUTE_THRESHOLD = 64
+# keyFeatures look like "AI Art Generator: creates ..."; only the title
+# before the colon is suggested, and only if it is short.
+MAX_FEATURE_TITLE_LENGTH = 40
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text):
+    """Lowercase words joined by single spaces ("GPT-4 Turbo" -> "gpt 4 turbo")."""
+    return " ".join(_WORD_RE.findall((text or "").lower()))
+
+
+def feature_title(feature):
+    if not isinstance(feature, str):
+        return None
+    title, colon, _ = feature.partition(":")
+    title = title.strip()
+    if not title or len(title) > MAX_FEATURE_TITLE_LENGTH or (not colon and len(feature) > MAX_FEATURE_TITLE_LENGTH):
+        return None
+    return title
+
+
+class SuggestIndex:
+    """
+    Typeahead over tool names, categories and keyFeatures titles.
+
+    Every suggestion is indexed under its normalized text and under each
+    later word start ("stable diffusion" also as "diffusion"), in one sorted
+    array: the keys matching a prefix are the contiguous range found with
+    bisect. Matches on the start of the text rank first, then by weight:
+    the total popularity of the tools behind a suggestion, then how many
+    tools share it, then the best trendScore. Prefixes with large ranges
+    ("a", "ai", ...) get their top MAX_SUGGESTIONS precomputed at build
+    time.
+    """
+
+    def __init__(self):
+        # (version, sorted keys, refs: [(entry, whole)], entries, entry ranks, {prefix: [entry, ...]})
+        self._state = None
+
+    @property
+    def is_loaded(self):
+        return self._state is not None
+
+    @staticmethod
+    def _collect(snapshot):
+        """Returns the suggestions as dicts keyed by (type, normalized text)."""
+        suggestions = {}
+
+        def add(kind, text, tool, tool_id=None):
+            key = normalize(text)
+            if not key:
+                return
+            entry = suggestions.get((kind, key))
+            if entry is None:
+                entry = suggestions[(kind, key)] = {
+                    "text": text, "type": kind, "id": tool_id, "popularity": 0, "tools": 0, "trendScore": 0,
+                }
+            entry["popularity"] += tool.get("popularity") or 0
+            entry["tools"] += 1
+            entry["trendScore"] = max(entry["trendScore"], tool.get("trendScore") or 0)
+
+        for tool in snapshot.documents:
+            if tool.get("name") and tool.get("id"):
+                add("tool", tool["name"], tool, tool["id"])
+            for category in dict.fromkeys(tool.get("categories") or []):
+                add("category", category, tool)
+            titles = (feature_title(feature) for feature in tool.get("keyFeatures") or [])
+            for title in dict.fromkeys(title for title in titles if title):
+                add("feature", title, tool)
+        # A feature title that is also a tool or category name is suggested once, as the latter
+        named = {key for kind, key in suggestions if kind != "feature"}
+        return {(kind, key): entry for (kind, key), entry in suggestions.items() if kind != "feature" or key not in named}
+
+    def update(self, snapshot):
+        if self._state is not None and self._state[0] == snapshot.version:
+            return
+        entries = []
+        pairs = []
+        for (_, key), suggestion in self._collect(snapshot).items():
+            entry = len(entries)
+            entries.append(suggestion)
+            words = key.split(" ")
+            for start in range(len(words)):
+                pairs.append((" ".join(words[start:]), entry, start == 0))
+        pairs.sort(key=lambda pair: pair[0])
+        keys = [key for key, _, _ in pairs]
+        refs = [(entry, whole) for _, entry, whole in pairs]
+        ranks = self._ranks(entries)
+
+        top = {}
+        self._precompute(keys, refs, ranks, 0, len(keys), 0, top)
+        self._state = (snapshot.version, keys, refs, entries, ranks, top)
+        print(f"✅ Suggest index updated: {len(entries)} suggestions, {len(keys)} keys, {len(top)} precomputed prefixes.")
+
+    @staticmethod
+    def _ranks(entries):
+        """entry -> rank, 0 being the heaviest, so ranking is a tuple compare on ints."""
+        order = sorted(
+            range(len(entries)),
+            key=lambda i: (-entries[i]["popularity"], -entries[i]["tools"], -entries[i]["trendScore"], entries[i]["text"].lower()),
+        )
+        ranks = [0] * len(entries)
+        for rank, entry in enumerate(order):
+            ranks[entry] = rank
+        return ranks
+
+    @staticmethod
+    def _rank_range(refs, ranks, lo, hi, limit):
+        best = {}
+        for entry, whole in refs[lo:hi]:
+            sort_key = (not whole, ranks[entry])
+            if entry not in best or sort_key < best[entry]:
+                best[entry] = sort_key
+        return sorted(best, key=best.__getitem__)[:limit]
+
+    def _precompute(self, keys, refs, ranks, lo, hi, depth, top):
+        """Stores the ranking of every prefix longer than depth whose range exceeds the threshold."""
+        position = lo
+        while position < hi:
+            if len(keys[position]) <= depth:
+                position += 1
+                continue
+            prefix = keys[position][:depth + 1]
+            end = bisect.bisect_left(keys, prefix + "\uffff", position, hi)
+            if end - position > PRECOMPUTE_THRESHOLD:
+                top[prefix] = self._rank_range(refs, ranks, position, end, MAX_SUGGESTIONS)
+                self._precompute(keys, refs, ranks, position, end, depth + 1, top)
+            position = end
+
+    def suggest(self, query, limit=8):
+        """Returns up to limit suggestions [{"text", "type", "id"}] for a prefix."""
+        _, keys, refs, entries, ranks, top = self._state
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        found = top.get(prefix)
+        if found is None:
+            lo = bisect.bisect_left(keys, prefix)
+            hi = bisect.bisect_left(keys, prefix + "\uffff", lo)
+            found = self._rank_range(refs, ranks, lo, hi, limit)
+        return [
+            {"text": entries[entry]["text"], "type": entries[entry]["type"], "id": entries[entry]["id"]}
+            for entry in found[:limit]
+        ]